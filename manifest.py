@@ -0,0 +1,22 @@
+# Manifiesto para congelar el proyecto dentro del firmware de MicroPython
+#
+# Al congelar los módulos, su bytecode queda en la flash y se ejecuta desde
+# allí, sin copiarlo a la RAM al importarlo. env.py también se congela para que
+# sus valores se lean como constantes del firmware en lugar de desde un módulo
+# cargado en el heap.
+#
+# main.py no se congela, se sigue copiando al sistema de archivos del dispositivo.
+#
+# Uso (desde el directorio ports/rp2 del código fuente de MicroPython):
+#   make BOARD=RPI_PICO_W FROZEN_MANIFEST=/ruta/al/proyecto/manifest.py
+
+# Mantengo los módulos congelados de la placa (urequests, red, etc.)
+include("$(BOARD_DIR)/manifest.py")
+
+package("Models", base_path="src")
+
+# Solo congelo env.py si se ha creado a partir de .env.example.py
+try:
+    module("env.py", base_path="src")
+except Exception:
+    pass
@@ -15,6 +15,11 @@
 #              Copia este archivo a env.py y actualiza los valores.
 #
 
+# Los valores enteros se declaran con const() para que MicroPython los trate
+# como constantes. const() solo admite enteros, si algún pin se deja sin
+# configurar hay que asignarle None directamente, sin const().
+from micropython import const
+
 # Modo de depuración (True/False)
 DEBUG = False
 
@@ -37,7 +42,7 @@ WIFI_ALTERNATIVES = [
 ]
 
 # ID del dispositivo (utilizado para la API e identificación)
-DEVICE_ID = 1
+DEVICE_ID = const(1)
 
 # Configuración de la API
 UPLOAD_API = True  # Lo configuro a False para desactivar las subidas a la API
@@ -49,13 +54,15 @@ API_TOKEN = "your_api_token"  # Token de autenticación para la API
 UPLOAD_HOME_ASSISTANT = False  # Lo configuro a False para desactivar las subidas a Home Assistant
 HOME_ASSISTANT_URL = "http://homeassistant.local:8123"  # URL de Home Assistant
 HOME_ASSISTANT_TOKEN = "your_long_lived_access_token"  # Token de acceso de larga duración
+HOME_ASSISTANT_BULK_PATH = None  # Ruta opcional que acepte {"states": [...]} para enviar todos los sensores en una petición (ej., "/api/webhook/solar_bulk")
 
 # Configuración de la conexión serial
-SERIAL_TX_PIN = 0  # Número de pin GPIO para TX (UART0 TX es GPIO0)
-SERIAL_RX_PIN = 1  # Número de pin GPIO para RX (UART0 RX es GPIO1)
+SERIAL_TX_PIN = const(0)  # Número de pin GPIO para TX (UART0 TX es GPIO0)
+SERIAL_RX_PIN = const(1)  # Número de pin GPIO para RX (UART0 RX es GPIO1)
+SERIAL_BAUDRATE = const(9600)  # Velocidad del UART, si el controlador no responde a ella se vuelve a 9600
 
 # Configuración del tiempo de espera
-SLEEP_TIME = 60  # Tiempo de espera entre lecturas en segundos
+SLEEP_TIME = const(60)  # Tiempo de espera entre lecturas en segundos
 
 # Configuración de batería externa (opcional)
 # Si tengo una batería externa conectada a un pin ADC
@@ -65,6 +72,6 @@ SLEEP_TIME = 60  # Tiempo de espera entre lecturas en segundos
 
 # Configuración de LEDs externos (opcional)
 # Si no se configuran, el programa funcionará sin usar LEDs externos
-LED_POWER_PIN = 15  # Número de pin GPIO para LED de encendido
-LED_UPLOAD_PIN = 14  # Número de pin GPIO para LED de subida a API/Home Assistant
-LED_CYCLE_PIN = 13  # Número de pin GPIO para LED de trabajo del ciclo
\ No newline at end of file
+LED_POWER_PIN = const(15)  # Número de pin GPIO para LED de encendido
+LED_UPLOAD_PIN = const(14)  # Número de pin GPIO para LED de subida a API/Home Assistant
+LED_CYCLE_PIN = const(13)  # Número de pin GPIO para LED de trabajo del ciclo
\ No newline at end of file
@@ -14,7 +14,7 @@
 # Description: Clase de conexión a la API para enviar datos a una API remota y
 #              recuperar datos de ella usando MicroPython en Raspberry Pi Pico.
 #
-# Dependencies: MicroPython, urequests, ujson
+# Dependencies: MicroPython, ujson
 #
 # Revision 0.02 - Adaptado para Raspberry Pi Pico con MicroPython
 # Additional Comments: Esta implementación incluye mecanismo de reintento y estado del microcontrolador
@@ -37,14 +37,20 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 
-import urequests
 import ujson
-import time
+from micropython import const
+from Models.HttpSession import HttpSession
+
+# Mensajes de depuración, al compilar con "make mpy" lo fijo a False y se
+# omite todo el código de depuración (make mpy DEBUG=1 para conservarlo)
+_DEBUG = const(True)
 
 # Configuraciones predeterminadas
 DEFAULT_RETRIES = 3
 DEFAULT_BACKOFF_FACTOR = 0.3
 DEFAULT_TIMEOUT = 30
+STATUS_CACHE_TTL_MS = 5000  # Vigencia del estado del microcontrolador en caché (SLEEP_TIME es 60 s)
+JSON_BUFFER_SIZE = 2048  # Búfer reutilizable de la carga útil en JSON, la de un ciclo ocupa ~1,5 KB
 
 
 class Api:
@@ -77,6 +83,25 @@ class Api:
         self.TIMEOUT = timeout
         self.DEBUG = debug
 
+        # Precalculo la URL completa y las cabeceras, no cambian entre peticiones
+        self._full_url = url + path
+        self._headers = {
+            "Authorization": "Bearer " + token,
+            "Content-Type": "application/json",
+            "Device-Id": str(device_id)
+        }
+
+        # Búfer donde serializo la carga útil en cada envío y claves ya
+        # codificadas ('"clave":'), así no creo la cadena JSON completa
+        self._json_buf = bytearray(JSON_BUFFER_SIZE)
+        self._json_mv = memoryview(self._json_buf)
+        self._json_keys = {}
+
+        # Sesión HTTP que se encarga de la conexión y de los reintentos
+        self._session = HttpSession(url, self._headers, retries=retries,
+                                    backoff_factor=backoff_factor,
+                                    timeout=timeout, debug=debug)
+
     def _get_microcontroller_status(self):
         """
         Obtengo información de estado desde el microcontrolador.
@@ -84,19 +109,9 @@ class Api:
         Returns:
             dict: Diccionario con información de estado del microcontrolador
         """
-        status = {
-            "temperature": self.CONTROLLER.get_cpu_temperature(),
-            "wifi_connected": self.CONTROLLER.wifi_is_connected(),
-            "wifi_signal_strength": self.CONTROLLER.get_wireless_rssi() if self.CONTROLLER.wifi_is_connected() else None,
-        }
-        
-        # Añado información de la batería si estuviera disponible
-        if hasattr(self.CONTROLLER, 'external_battery') and self.CONTROLLER.external_battery:
-            self.CONTROLLER.read_external_battery()
-            status["battery_percentage"] = self.CONTROLLER.external_battery["voltage_percentage"]
-            status["battery_voltage"] = self.CONTROLLER.external_battery["voltage_current"]
-        
-        return status
+        # El controlador guarda la última lectura, así Api y Home Assistant
+        # comparten el mismo estado dentro de un ciclo
+        return self.CONTROLLER.get_status(STATUS_CACHE_TTL_MS)
 
     def _parse_to_json(self, data):
         """
@@ -111,10 +126,66 @@ class Api:
         try:
             return ujson.dumps(data)
         except Exception as e:
-            if self.DEBUG:
+            if _DEBUG and self.DEBUG:
                 print(f"Error converting to JSON: {e}")
             return None
 
+    def _encode_payload(self, data):
+        """
+        Serializo en JSON los datos, el ID del dispositivo y el estado del
+        microcontrolador sobre el búfer reutilizable, sin copiar los datos a
+        otro diccionario.
+
+        Args:
+            data: Diccionario con datos para enviar
+
+        Returns:
+            memoryview: JSON sobre el búfer, válido hasta el siguiente envío,
+                        o None si no cabe en el búfer
+        """
+        mv = self._json_mv
+        size = len(mv)
+        keys = self._json_keys
+        dumps = ujson.dumps
+
+        mv[0] = 0x7B  # '{'
+        pos = 1
+
+        for key, value in data.items():
+            prefix = keys.get(key)
+
+            if prefix is None:
+                prefix = keys[key] = (dumps(key) + ":").encode()
+
+            value = dumps(value).encode()
+            end = pos + len(prefix) + len(value) + 1
+
+            if end > size:
+                return None
+
+            mv[pos:pos + len(prefix)] = prefix
+            pos += len(prefix)
+            mv[pos:end - 1] = value
+            mv[end - 1] = 0x2C  # ','
+            pos = end
+
+        tail = ('"hardware_device_id":' + dumps(self.DEVICE_ID) + ',"microcontroller":' +
+                dumps(self._get_microcontroller_status()) + '}').encode()
+        end = pos + len(tail)
+
+        if end > size:
+            return None
+
+        mv[pos:end] = tail
+
+        return mv[:end]
+
+    def close(self):
+        """
+        Cierro la conexión con la API.
+        """
+        self._session.close()
+
     def get_data_from_api(self):
         """
         Recupero datos desde la API con mecanismo de reintento.
@@ -122,49 +193,25 @@ class Api:
         Returns:
             dict: Datos de la API o False si falló
         """
-        for attempt in range(self.RETRIES):
-            try:
-                headers = {
-                    "Authorization": "Bearer " + self.TOKEN,
-                    "Content-Type": "application/json",
-                    "Device-Id": str(self.DEVICE_ID)
-                }
-
-                url = self.URL + self.URL_PATH
-
-                response = urequests.get(url, headers=headers)
-                
-                if self.DEBUG:
-                    print(f'Estado de Respuesta API: {response.status_code}')
-
-                # Verifico si la respuesta es exitosa
-                if response.status_code in [200, 201]:
-                    data = ujson.loads(response.text)
-                
-                    if self.DEBUG:
-                        print('Respuesta JSON de la API:', data)
-                
-                    return data
-                else:
-                    if self.DEBUG:
-                        print(f'Estado de Error API: {response.status_code}')
-                    
-                    # Espero antes de reintentar con retroceso exponencial
-                    wait_time = self.BACKOFF_FACTOR * (2 ** attempt)
-                    time.sleep(wait_time)
-                    
-            except Exception as e:
-                if self.DEBUG:
-                    print(f"Error al obtener datos de la API (intento {attempt+1}/{self.RETRIES}): {e}")
-                
-                # Espero antes de reintentar con retroceso exponencial
-                wait_time = self.BACKOFF_FACTOR * (2 ** attempt)
-                time.sleep(wait_time)
-        
-        # Todos los reintentos fallaron
-        return False
+        ok, body, _ = self._session.request_with_retry("GET", self.URL_PATH)
+
+        if not ok:
+            return False
+
+        try:
+            # Parseo directamente los bytes recibidos sin pasar por str
+            data = ujson.loads(body)
+        except Exception as e:
+            if _DEBUG and self.DEBUG:
+                print(f"Error al parsear la respuesta de la API: {e}")
+            return False
+
+        if _DEBUG and self.DEBUG:
+            print('Respuesta JSON de la API:', data)
+
+        return data
 
-    def send_to_api(self, data={}) -> bool:
+    def send_to_api(self, data=None) -> bool:
         """
         Envío datos a la API con mecanismo de reintento y estado del microcontrolador.
 
@@ -174,64 +221,43 @@ class Api:
         Returns:
             bool: True si la petición fue exitosa, False en caso contrario.
         """
-        for attempt in range(self.RETRIES):
-            try:
-                headers = {
-                    "Authorization": "Bearer " + self.TOKEN,
-                    "Content-Type": "application/json"
-                }
-
-                url = self.URL + self.URL_PATH
-                
-                # Obtengo el estado del microcontrolador
-                microcontroller_status = self._get_microcontroller_status()
-                
-                # Creo la carga útil con datos, ID del dispositivo y estado del microcontrolador
-                """
-                payload = {
-                    "data": data,
-                    "hardware_device_id": self.DEVICE_ID,
-                    "microcontroller": microcontroller_status
-                }
-                """
-
-                payload = data.copy()
-                payload["hardware_device_id"] = self.DEVICE_ID
-                payload["microcontroller"] = microcontroller_status
-
-                if self.DEBUG:
-                    print(f"Enviando a la API (intento {attempt+1}/{self.RETRIES}):")
-                    print(f"URL: {url}")
-                    print(f"Carga útil: {payload}")
-
-                # Envío la petición POST
-                response = urequests.post(url, headers=headers, json=payload)
-                
-                if self.DEBUG:
-                    print(f'Estado de Respuesta API: {response.status_code}')
-                    print(f'Texto de Respuesta API: {response.text}')
-
-                # Verifico si la respuesta es exitosa
-                if response.status_code in [200, 201]:
-                    return True
-                else:
-                    if self.DEBUG:
-                        print(f'Estado de Error API: {response.status_code}')
-                    
-                    # Espero antes de reintentar con retroceso exponencial
-                    wait_time = self.BACKOFF_FACTOR * (2 ** attempt)
-                    time.sleep(wait_time)
-                    
-            except Exception as e:
-                if self.DEBUG:
-                    print(f"Error al enviar datos a la API (intento {attempt+1}/{self.RETRIES}): {e}")
-                
-                # Espero antes de reintentar con retroceso exponencial
-                wait_time = self.BACKOFF_FACTOR * (2 ** attempt)
-                time.sleep(wait_time)
-        
-        # Todos los reintentos fallaron
-        return False
+        # Serializo la carga útil con datos, ID del dispositivo y estado del
+        # microcontrolador una sola vez, es la misma en todos los intentos
+        try:
+            body = self._encode_payload(data or {})
+        except Exception as e:
+            if _DEBUG and self.DEBUG:
+                print(f"Error converting to JSON: {e}")
+            return False
+
+        # Si no cabe en el búfer, la serializo como cadena
+        if body is None:
+            payload = {}
+
+            if data:
+                payload.update(data)
+
+            payload["hardware_device_id"] = self.DEVICE_ID
+            payload["microcontroller"] = self._get_microcontroller_status()
+            body = self._parse_to_json(payload)
+            del payload
+
+            if body is None:
+                return False
+
+        if _DEBUG and self.DEBUG:
+            print("Enviando a la API:")
+            print(f"URL: {self._full_url}")
+            # Solo convierto la vista del búfer, la serialización de respaldo ya es str
+            print(f"Carga útil: {bytes(body) if isinstance(body, memoryview) else body}")
+
+        ok, _, _ = self._session.request_with_retry("POST", self.URL_PATH, body)
+
+        # Libero la respuesta antes de seguir con el ciclo
+        del body
+        self._session.collect()
+
+        return ok
         
     def upload(self, data, method='POST'):
         """
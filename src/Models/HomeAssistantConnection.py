@@ -14,7 +14,7 @@
 # Description: Clase de conexión a Home Assistant para enviar datos a Home Assistant
 #              utilizando la API REST desde una Raspberry Pi Pico con MicroPython.
 #
-# Dependencies: MicroPython, urequests, ujson
+# Dependencies: MicroPython, ujson
 #
 # Revision 0.01 - File Created
 # Additional Comments: Esta implementación incluye mecanismo de reintento y manejo de errores
@@ -37,14 +37,66 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 
-import urequests
 import ujson
 import time
+import micropython
+from micropython import const
+import random
+from Models.HttpSession import HttpSession
+
+# Mensajes de depuración, al compilar con "make mpy" lo fijo a False y se
+# omite todo el código de depuración (make mpy DEBUG=1 para conservarlo)
+_DEBUG = const(True)
 
 # Configuraciones predeterminadas
 DEFAULT_RETRIES = 3
 DEFAULT_BACKOFF_FACTOR = 0.3
 DEFAULT_TIMEOUT = 10
+STATUS_CACHE_TTL_MS = 5000  # Vigencia del estado del microcontrolador en caché (SLEEP_TIME es 60 s)
+CONNECTION_CACHE_TTL_MS = 300000  # Vigencia de una comprobación correcta, varios ciclos (SLEEP_TIME es 60 s), un fallo la anula
+SANITIZE_CACHE_SIZE = 32  # Máximo de textos sanitizados que guardo en caché
+DEVICE_ANCHOR_KEY = "device_id"  # Sensor del controlador solar que lleva la información del dispositivo
+REQUEST_RETRIES = 2  # Intentos por petición dentro de un ciclo, el resto se reparte entre ciclos
+CIRCUIT_BASE_MS = 30000  # Tiempo que dejo de intentar enviar tras el primer fallo
+CIRCUIT_MAX_MS = 600000  # Máximo tiempo sin intentar enviar tras fallos consecutivos
+BODY_BUFFER_SIZE = 1024  # Tamaño del buffer reutilizable donde compongo el cuerpo de cada sensor
+FULL_PUSH_INTERVAL = 3600  # Segundos entre envíos completos de todos los sensores aunque no cambien
+
+# Variación mínima por unidad para volver a enviar un sensor, el resto solo si cambia
+DELTA_TOLERANCE = {
+    "V": 0.05,
+    "A": 0.1,
+    "W": 1,
+    "C": 0.5
+}
+
+# Reemplazos de caracteres especiales conocidos por equivalentes ASCII
+_TRANS = {
+    "°": "",
+    "ñ": "n",
+    "á": "a",
+    "é": "e",
+    "í": "i",
+    "ó": "o",
+    "ú": "u",
+    "Á": "A",
+    "É": "E",
+    "Í": "I",
+    "Ó": "O",
+    "Ú": "U",
+    "ü": "u",
+    "Ü": "U",
+    "ç": "c",
+    "Ç": "C"
+}
+
+# Tabla para str.translate, reemplaza todos los caracteres en una pasada en C.
+# MicroPython solo la incluye en algunas compilaciones, si no la tiene recorro
+# el texto con el diccionario anterior
+try:
+    _TRANS_TABLE = str.maketrans(_TRANS)
+except AttributeError:
+    _TRANS_TABLE = None
 
 class HomeAssistantConnection:
     """
@@ -60,12 +112,13 @@ class HomeAssistantConnection:
         retries: Número de reintentos para solicitudes fallidas.
         backoff_factor: Factor de retroceso para reintentos.
         timeout: Tiempo de espera para solicitudes en segundos.
+        bulk_path: Ruta opcional para enviar todos los estados en una sola petición.
         debug: Bandera booleana opcional para modo de depuración.
     """
     
     def __init__(self, controller, url, token, device_id=1,
                  retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
-                 timeout=DEFAULT_TIMEOUT, debug=False):
+                 timeout=DEFAULT_TIMEOUT, bulk_path=None, debug=False):
         """
         Inicializo la conexión con Home Assistant.
         
@@ -77,6 +130,9 @@ class HomeAssistantConnection:
             retries: Número de reintentos para solicitudes fallidas.
             backoff_factor: Factor de retroceso para reintentos.
             timeout: Tiempo de espera para solicitudes en segundos.
+            bulk_path: Ruta opcional (webhook, rest_command, python_script...) que
+                       acepta {"states": [...]} para actualizar todos los sensores
+                       en una sola petición.
             debug: Bandera booleana opcional para modo de depuración.
         """
         self.URL = url.rstrip('/')  # Elimino la barra final si está presente
@@ -86,16 +142,80 @@ class HomeAssistantConnection:
         self.RETRIES = retries
         self.BACKOFF_FACTOR = backoff_factor
         self.TIMEOUT = timeout
+        self.BULK_PATH = bulk_path
         self.DEBUG = debug
+
+        # Cola de estados pendientes de enviar en el próximo flush(). Cada
+        # elemento es (entity_id, fragmentos en bytes que forman el cuerpo JSON)
+        self._pending = []
+
+        # Buffer reutilizable en el que compongo el cuerpo de cada petición
+        self._body_buf = bytearray(BODY_BUFFER_SIZE)
+        self._body_mv = memoryview(self._body_buf)
         
         # Punto final de la API para estados
         self.API_STATES_ENDPOINT = "/api/states/"
+
+        # Precalculo las cabeceras, el token no cambia durante la ejecución
+        self._headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+
+        # Estado de la última comprobación de conexión: None si no se ha comprobado
+        # o se ha anulado, y marca de tiempo (ticks) hasta la que considero válida
+        # una comprobación correcta, solo la miro si _ha_reachable es True
+        self._ha_reachable = None
+        self._ha_ok_until = 0
+
+        # Cortocircuito tras un fallo: fallos consecutivos y marca de tiempo
+        # (ticks) hasta la que no vuelvo a intentar enviar nada
+        self._circuit_failures = 0
+        self._circuit_open_until = 0
+
+        # Últimos valores enviados de cada sensor del controlador solar, solo
+        # reenvío los que cambian salvo en el envío completo periódico (ticks)
+        self._last_values = {}
+        self._force_full_push_interval = FULL_PUSH_INTERVAL
+        self._next_full_push = None
+
+        # Diccionario reutilizable para los atributos de los sensores del microcontrolador
+        self._attr_scratch = {}
+
+        # Cadenas y metadatos derivados de cada clave, las claves no cambian entre
+        # ciclos. El unique_id depende del identificador del dispositivo, si
+        # cambia vuelvo a calcularlos
+        self._key_meta = {}
+        self._key_meta_identifier = None
+        self._path_cache = {}
+
+        # Esqueletos JSON con los atributos fijos de cada sensor, dependen del dispositivo
+        self._skeleton_cache = {}
+
+        # Caché de textos con caracteres especiales ya sanitizados
+        self._sanitize_cache = {}
+
+        # Identificadores (id) de los diccionarios que ya están sanitizados
+        self._clean_cache = set()
+
+        # Sesión HTTP persistente para encadenar varias actualizaciones sobre el mismo socket.
+        # Dentro de un ciclo solo reintento una vez, si sigue fallando abro el
+        # cortocircuito y los siguientes reintentos se hacen en ciclos posteriores
+        self._session = HttpSession(self.URL, self._headers, retries=min(retries, REQUEST_RETRIES),
+                                    backoff_factor=backoff_factor,
+                                    timeout=timeout, debug=debug)
         
         # Almaceno la información del dispositivo para asegurar consistencia entre sensores
         self.device_info = None
+
+        # Información del dispositivo ya serializada y (device_id, version) con
+        # los que se generó, solo la regenero si cambian
+        self._device_info_bytes = None
+        self._device_info_key = None
         
-        # Almaceno la última vez que se actualizó la entidad del dispositivo
-        self.last_device_update = 0
+        # Almaceno la última vez (ticks) que se actualizó la entidad del dispositivo,
+        # None si todavía no se ha actualizado
+        self.last_device_update = None
         
         # Intervalo de actualización para la entidad del dispositivo (en segundos)
         # Por defecto, actualizar cada hora (3600 segundos)
@@ -108,10 +228,13 @@ class HomeAssistantConnection:
         Returns:
             dict: Cabeceras para las peticiones a la API
         """
-        return {
-            "Authorization": f"Bearer {self.TOKEN}",
-            "Content-Type": "application/json"
-        }
+        return self._headers
+
+    def close(self):
+        """
+        Cierro la conexión persistente con Home Assistant.
+        """
+        self._session.close()
     
     def _get_microcontroller_status(self):
         """
@@ -120,47 +243,176 @@ class HomeAssistantConnection:
         Returns:
             dict: Diccionario con información de estado del microcontrolador
         """
-        status = {
-            "temperature": self.CONTROLLER.get_cpu_temperature(),
-            "wifi_connected": self.CONTROLLER.wifi_is_connected(),
-            "wifi_signal_strength": self.CONTROLLER.get_wireless_rssi() if self.CONTROLLER.wifi_is_connected() else None,
-        }
-        
-        # Añado información de la batería si está disponible
-        if hasattr(self.CONTROLLER, 'external_battery') and self.CONTROLLER.external_battery:
-            self.CONTROLLER.read_external_battery()
-            status["battery_percentage"] = self.CONTROLLER.external_battery["voltage_percentage"]
-            status["battery_voltage"] = self.CONTROLLER.external_battery["voltage_current"]
-        
-        return status
+        # El controlador guarda la última lectura, así Api y Home Assistant
+        # comparten el mismo estado dentro de un ciclo
+        return self.CONTROLLER.get_status(STATUS_CACHE_TTL_MS)
     
+    def _circuit_is_open(self):
+        """
+        Compruebo si el cortocircuito sigue abierto tras fallos recientes.
+
+        Returns:
+            bool: True si todavía no debo intentar enviar nada
+        """
+        return self._circuit_failures > 0 and \
+            time.ticks_diff(self._circuit_open_until, time.ticks_ms()) > 0
+
+    def _record_result(self, ok):
+        """
+        Actualizo el cortocircuito con el resultado de un envío.
+
+        Un fallo anula la última comprobación de conexión correcta. Cada
+        fallo consecutivo duplica el tiempo sin intentar enviar (hasta
+        CIRCUIT_MAX_MS) con una parte aleatoria para no coincidir con otros
+        dispositivos al recuperarse Home Assistant.
+
+        Args:
+            ok (bool): True si el envío fue correcto
+        """
+        if ok:
+            self._circuit_failures = 0
+            return
+
+        # Tras un fallo vuelvo a comprobar la conexión en el siguiente ciclo.
+        # Anulo el resultado en lugar de escribir un tick: ticks_diff() da la
+        # vuelta cada 2^30 ms y un 0 podría parecer una marca futura
+        self._ha_reachable = None
+
+        failures = self._circuit_failures
+        wait_ms = min(CIRCUIT_BASE_MS << failures, CIRCUIT_MAX_MS)
+        wait_ms += random.getrandbits(16) % (wait_ms // 4 + 1)
+
+        self._circuit_failures = failures + 1
+        self._circuit_open_until = time.ticks_add(time.ticks_ms(), wait_ms)
+
+        if _DEBUG and self.DEBUG:
+            print(f"Home Assistant no responde, no vuelvo a intentarlo en {wait_ms} ms")
+
     def check_connection(self):
         """
         Compruebo si Home Assistant es accesible.
+
+        Si la última comprobación correcta es reciente (CONNECTION_CACHE_TTL_MS)
+        devuelvo el resultado guardado sin hacer una nueva petición.
         
         Returns:
             bool: True si Home Assistant es accesible, False en caso contrario
         """
+        if self._ha_reachable and time.ticks_diff(self._ha_ok_until, time.ticks_ms()) > 0:
+            return True
+
+        # Tras un fallo reciente no pierdo tiempo comprobando la conexión
+        if self._circuit_is_open():
+            return False
+
+        reachable = False
+
         try:
-            url = f"{self.URL}/api/"
-            headers = self._get_headers()
-            
-            response = urequests.get(url, headers=headers)
+            # Uso la misma conexión persistente que las actualizaciones posteriores
+            status_code, _ = self._session.request("GET", "/api/", read_body=False)
             
-            if response.status_code == 200:
-                if self.DEBUG:
+            if status_code == 200:
+                if _DEBUG and self.DEBUG:
                     print("Home Assistant es accesible")
-                return True
+                reachable = True
             else:
-                if self.DEBUG:
-                    print(f"Home Assistant devolvió código de estado: {response.status_code}")
-                return False
+                if _DEBUG and self.DEBUG:
+                    print(f"Home Assistant devolvió código de estado: {status_code}")
                 
         except Exception as e:
-            if self.DEBUG:
+            if _DEBUG and self.DEBUG:
                 print(f"Error al conectar con Home Assistant: {e}")
-            return False
+
+        self._ha_reachable = reachable
+        self._record_result(reachable)
+
+        if reachable:
+            self._ha_ok_until = time.ticks_add(time.ticks_ms(), CONNECTION_CACHE_TTL_MS)
+
+        return reachable
     
+    def _encode_state(self, state, attributes=None):
+        """
+        Serializo la carga útil de un sensor.
+
+        Args:
+            state: El valor de estado a establecer
+            attributes (dict, opcional): Atributos adicionales para el sensor
+
+        Returns:
+            bytes: Cuerpo JSON {"state": ..., "attributes": {...}}
+        """
+        payload = {
+            "state": state
+        }
+        
+        # Añado atributos si se proporcionan, sanitizando los valores
+        if attributes:
+            payload["attributes"] = self._sanitize_attributes(attributes)
+
+        return ujson.dumps(payload).encode()
+
+    def _encode_payload(self, parts):
+        """
+        Compongo el cuerpo de una petición copiando sus fragmentos sobre el
+        buffer reutilizable, sin crear bytes intermedios.
+
+        Args:
+            parts (tuple): Fragmentos en bytes que forman el cuerpo JSON
+
+        Returns:
+            memoryview|bytes: Vista sobre el buffer con el cuerpo, o bytes
+                              nuevos si no cabe en el buffer
+        """
+        mv = self._body_mv
+        size = len(mv)
+        pos = 0
+
+        for part in parts:
+            end = pos + len(part)
+
+            # Si no cabe lo uno en memoria nueva, ocurre solo con cargas inusuales
+            if end > size:
+                return b"".join(parts)
+
+            mv[pos:end] = part
+            pos = end
+
+        return mv[:pos]
+
+    def _post_state(self, entity_id, body):
+        """
+        Envío el cuerpo ya serializado de un sensor a su endpoint de estados.
+
+        Args:
+            entity_id (str): El ID de la entidad del sensor
+            body (bytes|memoryview): Cuerpo JSON {"state": ..., "attributes": {...}}
+
+        Returns:
+            bool: True si fue exitoso, False en caso contrario
+        """
+        # Si un envío anterior falló no espero a los reintentos de cada sensor
+        if self._circuit_is_open():
+            return False
+
+        path = self._path_cache.get(entity_id)
+
+        if path is None:
+            path = self.API_STATES_ENDPOINT + entity_id
+            self._path_cache[entity_id] = path
+        
+        if _DEBUG and self.DEBUG:
+            print(f"Actualizando sensor {entity_id}:")
+            print(f"URL: {self.URL}{path}")
+            print(f"Carga útil: {bytes(body)}")
+        
+        # Envío la petición POST reutilizando la conexión abierta.
+        # Solo necesito el código de estado, descarto el cuerpo de la respuesta
+        ok, _, _ = self._session.request_with_retry("POST", path, body, read_body=False)
+        self._record_result(ok)
+
+        return ok
+
     def update_sensor(self, entity_id, state, attributes=None):
         """
         Actualizo el estado de un sensor en Home Assistant.
@@ -173,53 +425,130 @@ class HomeAssistantConnection:
         Returns:
             bool: True si fue exitoso, False en caso contrario
         """
-        for attempt in range(self.RETRIES):
-            try:
-                url = f"{self.URL}{self.API_STATES_ENDPOINT}{entity_id}"
-                headers = self._get_headers()
-                
-                # Preparo la carga útil
-                payload = {
-                    "state": state
-                }
-                
-                # Añado atributos si se proporcionan, sanitizando los valores
-                if attributes:
-                    payload["attributes"] = self._sanitize_attributes(attributes)
-                
-                if self.DEBUG:
-                    print(f"Actualizando sensor {entity_id} (intento {attempt+1}/{self.RETRIES}):")
-                    print(f"URL: {url}")
-                    print(f"Carga útil: {payload}")
-                
-                # Envío la petición POST
-                response = urequests.post(url, headers=headers, json=payload)
-                
-                if self.DEBUG:
-                    print(f"Estado de Respuesta de Home Assistant: {response.status_code}")
-                
-                # Compruebo si la respuesta es exitosa
-                if response.status_code in [200, 201]:
-                    return True
-                else:
-                    if self.DEBUG:
-                        print(f"Estado de Error de Home Assistant: {response.status_code}")
-                        print(f"Texto de Respuesta: {response.text}")
-                    
-                    # Espero antes de reintentar con retroceso exponencial
-                    wait_time = self.BACKOFF_FACTOR * (2 ** attempt)
-                    time.sleep(wait_time)
-                    
-            except Exception as e:
-                if self.DEBUG:
-                    print(f"Error al actualizar sensor (intento {attempt+1}/{self.RETRIES}): {e}")
-                
-                # Espero antes de reintentar con retroceso exponencial
-                wait_time = self.BACKOFF_FACTOR * (2 ** attempt)
-                time.sleep(wait_time)
-        
-        # Todos los reintentos fallaron
-        return False
+        if self._circuit_is_open():
+            return False
+
+        try:
+            body = self._encode_state(state, attributes)
+        except Exception as e:
+            if _DEBUG and self.DEBUG:
+                print(f"Error al serializar el sensor {entity_id}: {e}")
+            return False
+
+        return self._post_state(entity_id, body)
+
+    def queue_sensor(self, entity_id, state, attributes=None):
+        """
+        Añado la actualización de un sensor a la cola para enviarla en flush().
+
+        La carga útil se serializa en este momento, así no dependo de que el
+        diccionario de atributos siga igual hasta el envío.
+
+        Args:
+            entity_id (str): El ID de la entidad del sensor
+            state: El valor de estado a establecer
+            attributes (dict, opcional): Atributos adicionales para el sensor
+        """
+        try:
+            self._pending.append((entity_id, (self._encode_state(state, attributes),)))
+        except Exception as e:
+            if _DEBUG and self.DEBUG:
+                print(f"Error al serializar el sensor {entity_id}: {e}")
+
+    def flush(self):
+        """
+        Envío todos los estados pendientes de la cola.
+
+        Si se configuró bulk_path mando todos los estados en una sola petición
+        {"states": [{"entity_id": ..., "state": ..., "attributes": ...}]}.
+        Si no, Home Assistant no tiene un endpoint para actualizar varios estados
+        a la vez, así que encadeno las peticiones sobre el socket persistente de
+        la sesión evitando una negociación TCP/TLS por sensor.
+
+        Returns:
+            set: entity_id de los sensores que Home Assistant aceptó, vacío
+                 (falso) si no se actualizó ninguno
+        """
+        pending = self._pending
+        sent = set()
+
+        if not pending:
+            return sent
+
+        # Vacío la cola antes de enviar, lo que falle no se queda en ella: quien
+        # encoló decide qué reenviar según los entity_id devueltos
+        self._pending = []
+
+        if self._circuit_is_open():
+            if _DEBUG and self.DEBUG:
+                print(f"Home Assistant no responde, descarto {len(pending)} estados")
+        elif self.BULK_PATH:
+            # Inserto el entity_id al principio de cada cuerpo ya serializado
+            # ({"state": ...} pasa a {"entity_id": "...", "state": ...}) y uno
+            # todos los fragmentos de una sola vez
+            chunks = [b'{"states":[']
+            append = chunks.append
+            extend = chunks.extend
+
+            for entity_id, parts in pending:
+                if len(chunks) > 1:
+                    append(b',')
+
+                append(b'{"entity_id":"')
+                append(entity_id.encode())
+                append(b'",')
+                append(parts[0][1:])
+                extend(parts[1:])
+
+            append(b']}')
+            body = b''.join(chunks)
+            del chunks
+
+            if _DEBUG and self.DEBUG:
+                print(f"Enviando {len(pending)} estados en una sola petición a {self.BULK_PATH}")
+
+            success, _, _ = self._session.request_with_retry("POST", self.BULK_PATH, body, read_body=False)
+            self._record_result(success)
+
+            del body
+
+            # El lote se acepta o se rechaza entero
+            if success:
+                for entity_id, _ in pending:
+                    sent.add(entity_id)
+        else:
+            # El cuerpo de cada sensor se compone sobre el mismo buffer, que puedo
+            # reutilizar porque cada petición termina antes de la siguiente
+            encode_payload = self._encode_payload
+            post_state = self._post_state
+
+            for entity_id, parts in pending:
+                if post_state(entity_id, encode_payload(parts)):
+                    sent.add(entity_id)
+
+        del pending
+
+        # Recolecto una vez al terminar el lote en lugar de tras cada sensor
+        self._session.collect()
+
+        return sent
+
+    def update_sensors_bulk(self, entries):
+        """
+        Actualizo varios sensores en un solo lote.
+
+        Args:
+            entries (iterable): Tuplas (entity_id, state, attributes)
+
+        Returns:
+            bool: True si al menos un sensor se actualizó correctamente
+        """
+        queue_sensor = self.queue_sensor
+
+        for entity_id, state, attributes in entries:
+            queue_sensor(entity_id, state, attributes)
+
+        return bool(self.flush())
     
     def _capitalize_words(self, text):
         """
@@ -234,17 +563,21 @@ class HomeAssistantConnection:
         """
         if not text:
             return ""
-        
-        words = text.split(' ')
-        capitalized_words = []
-        
-        for word in words:
-            if word:
-                capitalized_words.append(word[0].upper() + word[1:])
-            else:
-                capitalized_words.append("")
-                
-        return ' '.join(capitalized_words)
+
+        # Paso a mayúscula sobre un único buffer la primera letra (ASCII) tras
+        # cada espacio, sin crear una lista ni una cadena por palabra
+        buf = bytearray(text.encode())
+        upper = True
+
+        for i in range(len(buf)):
+            c = buf[i]
+
+            if upper and 97 <= c <= 122:
+                buf[i] = c - 32
+
+            upper = c == 32
+
+        return buf.decode()
         
     def _sanitize_string(self, text):
         """
@@ -259,30 +592,30 @@ class HomeAssistantConnection:
         """
         if not text:
             return ""
-            
-        # Reemplazo caracteres especiales conocidos
-        replacements = {
-            "°": "",
-            "ñ": "n",
-            "á": "a",
-            "é": "e",
-            "í": "i",
-            "ó": "o",
-            "ú": "u",
-            "Á": "A",
-            "É": "E",
-            "Í": "I",
-            "Ó": "O",
-            "Ú": "U",
-            "ü": "u",
-            "Ü": "U",
-            "ç": "c",
-            "Ç": "C"
-        }
-        
-        result = text
-        for char, replacement in replacements.items():
-            result = result.replace(char, replacement)
+
+        # Si todos los caracteres son ASCII (mismo número de bytes que de
+        # caracteres) no hay nada que reemplazar y devuelvo el mismo objeto
+        if len(text) == len(text.encode()):
+            return text
+
+        cache = self._sanitize_cache
+        result = cache.get(text)
+
+        if result is not None:
+            return result
+
+        # Reemplazo los caracteres especiales conocidos en una sola pasada
+        if _TRANS_TABLE is not None:
+            result = text.translate(_TRANS_TABLE)
+        else:
+            get = _TRANS.get
+            result = "".join([get(char, char) for char in text])
+
+        # Mantengo la caché acotada, la vacío entera al llenarse
+        if len(cache) >= SANITIZE_CACHE_SIZE:
+            cache.clear()
+
+        cache[text] = result
             
         return result
         
@@ -298,12 +631,22 @@ class HomeAssistantConnection:
         """
         if not attributes:
             return {}
+
+        # Los diccionarios ya sanitizados (como device_info) los devuelvo tal cual
+        clean_cache = self._clean_cache
+
+        if id(attributes) in clean_cache:
+            return attributes
             
         result = {}
+        sanitize_string = self._sanitize_string
+
         for key, value in attributes.items():
-            if isinstance(value, str):
-                result[key] = self._sanitize_string(value)
-            elif isinstance(value, dict):
+            value_type = type(value)
+
+            if value_type is str:
+                result[key] = sanitize_string(value)
+            elif value_type is dict and id(value) not in clean_cache:
                 result[key] = self._sanitize_attributes(value)
             else:
                 result[key] = value
@@ -371,7 +714,7 @@ class HomeAssistantConnection:
         "battery_type": {"unit_of_measurement": None, "device_class": None, "state_class": None}
     }
     
-    def update_solar_controller_data(self, data):
+    def update_solar_controller_data(self, data, include_microcontroller=True):
         """
         Actualizo todos los sensores del controlador solar en Home Assistant.
         
@@ -380,81 +723,252 @@ class HomeAssistantConnection:
         
         Args:
             data (dict): Diccionario con datos del controlador solar
+            include_microcontroller (bool): Si es True envío también los sensores
+                                            del microcontrolador en el mismo lote
             
         Returns:
             bool: True si al menos un sensor se actualizó correctamente, False en caso contrario
         """
         if not data:
-            if self.DEBUG:
+            if _DEBUG and self.DEBUG:
                 print("No se proporcionaron datos para actualizar los sensores del controlador solar")
             return False
-        
-        # Obtengo el estado del microcontrolador para incluirlo en los atributos
-        microcontroller_status = self._get_microcontroller_status()
-        
-        # Hago seguimiento del éxito de las actualizaciones
-        success = False
-        
-        # Atributos comunes para todos los sensores
-        common_attributes = {
-            "microcontroller": microcontroller_status,
-            "last_update": time.time()
-        }
+
+        # Si la última comprobación indicó que Home Assistant no responde, no
+        # intento actualizar cada sensor con todos sus reintentos
+        if self._ha_reachable is False or self._circuit_is_open():
+            if _DEBUG and self.DEBUG:
+                print("Home Assistant no es accesible, omito la actualización de sensores")
+            return False
         
         # Información del dispositivo para agrupar sensores
         device_id = data.get('device_id', 'unknown')
-        self.device_info = {
-            "identifiers": [f"renogy_rover_li_{device_id}"],
-            "name": f"Controlador Solar Renogy Rover Li {device_id}",
-            "manufacturer": "Renogy",
-            "model": "Rover Li",
-            "sw_version": data.get('version', 'unknown'),
-            "suggested_area": "Exterior"
-        }
-        
-        # Actualizo cada punto de datos como un sensor separado
+        version = data.get('version', 'unknown')
+
+        # Solo reconstruyo la información del dispositivo si ha cambiado
+        self._ensure_device_info(device_id, version)
+
+        # Serializo una sola vez la parte de los atributos que cambia en cada ciclo:
+        # la hora y el estado del microcontrolador
+        dynamic = b'{"last_update":' + str(time.time()).encode() + \
+            b',"microcontroller":' + ujson.dumps(self._get_microcontroller_status()).encode() + b','
+
+        # Cada cierto tiempo envío todos los sensores aunque no hayan cambiado
+        now_ms = time.ticks_ms()
+        full_push = self._next_full_push is None or time.ticks_diff(self._next_full_push, now_ms) <= 0
+
+        # Enlazo a nombres locales lo que uso en cada iteración
+        skeleton_cache = self._skeleton_cache
+        build_skeleton = self._build_skeleton
+        dumps = ujson.dumps
+        append = self._pending.append
+        last_values = self._last_values
+        tolerances = _SENSOR_TOLERANCE
+        changed = {}
+
         for key, value in data.items():
             # Omito valores nulos
             if value is None:
                 continue
-                
-            # Creo el ID de entidad a partir de la clave
-            entity_id = f"sensor.solar_{key.lower().replace(' ', '_')}"
-            
-            # Creo atributos específicos para este sensor
-            attributes = dict(common_attributes)
-            
-            # Uso la función personalizada en lugar de .title() que no está disponible en MicroPython
-            replaced_key = key.replace('_', ' ')
-            
-            # Evito redundancia en nombres como "Solar Solar Voltage"
-            if replaced_key.lower().startswith('solar '):
-                attributes["friendly_name"] = self._capitalize_words(replaced_key)
-            else:
-                attributes["friendly_name"] = f"Solar {self._capitalize_words(replaced_key)}"
-            
-            # Añado metadatos específicos para este tipo de sensor
-            if key in self.SENSOR_METADATA:
-                metadata = self.SENSOR_METADATA[key]
-                if metadata["unit_of_measurement"]:
-                    attributes["unit_of_measurement"] = metadata["unit_of_measurement"]
-                if metadata["device_class"]:
-                    attributes["device_class"] = metadata["device_class"]
-                if metadata["state_class"]:
-                    attributes["state_class"] = metadata["state_class"]
-            
-            # Añado información del dispositivo para agrupar sensores
-            attributes["device"] = self.device_info
-            
-            # Añado unique_id para permitir la gestión desde la UI de Home Assistant
-            # Uso el mismo formato que el identificador del dispositivo para mantener consistencia
-            attributes["unique_id"] = f"{self.device_info['identifiers'][0]}_{key.lower().replace(' ', '_')}"
-            
-            # Actualizo el sensor
-            if self.update_sensor(entity_id, value, attributes):
-                success = True
+
+            # Omito los valores que no han cambiado (o lo han hecho menos que la
+            # tolerancia de su unidad) desde el último envío
+            if not full_push and key in last_values:
+                last = last_values[key]
+
+                if last == value:
+                    continue
+
+                tolerance = tolerances.get(key)
+
+                if tolerance and type(value) in (int, float) and type(last) in (int, float) \
+                        and abs(value - last) <= tolerance:
+                    continue
+
+            # Obtengo (o calculo la primera vez) el esqueleto con los atributos
+            # fijos del sensor ya serializados
+            skeleton = skeleton_cache.get(key)
+
+            if skeleton is None:
+                skeleton = build_skeleton(key)
+                skeleton_cache[key] = skeleton
+
+            entity_id, static = skeleton
+            changed[entity_id] = (key, value)
+
+            # Solo serializo el estado, el resto del cuerpo ya está en bytes y
+            # los fragmentos se copian al buffer de envío en flush()
+            append((entity_id, (b'{"state":', dumps(value).encode(), b',"attributes":', dynamic, static, b'}')))
         
-        return success
+        if _DEBUG and self.DEBUG:
+            print(f"Envío {len(changed)} de {len(data)} sensores del controlador solar")
+
+        # Añado los sensores del microcontrolador al mismo lote, así no necesitan
+        # sus propias peticiones
+        if include_microcontroller:
+            self.queue_microcontroller_sensors()
+
+        if not self._pending:
+            if _DEBUG and self.DEBUG:
+                print("Ningún sensor ha cambiado, no envío nada")
+            return True
+
+        # Envío todos los sensores en un solo lote
+        sent = self.flush()
+
+        # Solo doy por enviados los valores que Home Assistant aceptó, los que
+        # fallaron se vuelven a enviar en el siguiente ciclo
+        for entity_id in sent:
+            item = changed.get(entity_id)
+
+            if item is not None:
+                last_values[item[0]] = item[1]
+
+        if sent and full_push:
+            self._next_full_push = time.ticks_add(now_ms, self._force_full_push_interval * 1000)
+
+        return bool(sent)
+
+    @micropython.native
+    def _build_entity(self, key):
+        """
+        Construyo las cadenas derivadas de una clave de datos.
+
+        Compilo este método con el emisor nativo, por eso no uso argumentos
+        con nombre ni generadores dentro.
+
+        Args:
+            key (str): Clave del dato del controlador solar
+
+        Returns:
+            tuple: (entity_id, friendly_name, slug)
+        """
+        slug = key.lower().replace(' ', '_')
+
+        # Uso la función personalizada en lugar de .title() que no está disponible en MicroPython
+        replaced_key = key.replace('_', ' ')
+
+        # Evito redundancia en nombres como "Solar Solar Voltage"
+        if replaced_key.lower().startswith('solar '):
+            friendly_name = self._capitalize_words(replaced_key)
+        else:
+            friendly_name = "Solar " + self._capitalize_words(replaced_key)
+
+        return ("sensor.solar_" + slug, friendly_name, slug)
+
+    def _get_key_meta(self, key):
+        """
+        Obtengo (o calculo la primera vez) las cadenas y metadatos de una clave.
+
+        Args:
+            key (str): Clave del dato del controlador solar
+
+        Returns:
+            tuple: (entity_id, friendly_name, unique_id)
+        """
+        identifier = self.device_info["identifiers"][0]
+
+        # Si cambia el identificador del dispositivo los unique_id ya no sirven
+        if identifier != self._key_meta_identifier:
+            self._key_meta = {}
+            self._key_meta_identifier = identifier
+
+        meta = self._key_meta.get(key)
+
+        if meta is None:
+            entity_id, friendly_name, slug = self._build_entity(key)
+
+            # Uso el mismo formato que el identificador del dispositivo para mantener consistencia
+            meta = (entity_id, friendly_name, f"{identifier}_{slug}")
+            self._key_meta[key] = meta
+
+        return meta
+
+    def _build_skeleton(self, key):
+        """
+        Preparo la parte fija del cuerpo JSON de un sensor del controlador solar.
+
+        Args:
+            key (str): Clave del dato del controlador solar
+
+        Returns:
+            tuple: (entity_id, bytes con los atributos fijos serializados sin la
+                   llave de apertura, para añadirlos tras los atributos dinámicos)
+        """
+        entity_id, friendly_name, unique_id = self._get_key_meta(key)
+
+        # Añado unique_id para permitir la gestión desde la UI de Home Assistant,
+        # con él agrupo el sensor sin repetir la información del dispositivo en cada uno
+        attributes = {
+            "friendly_name": friendly_name,
+            "unique_id": unique_id
+        }
+
+        # Quito las llaves, la de apertura la pone la parte dinámica que va
+        # delante y detrás añado los metadatos del sensor ya serializados
+        static = ujson.dumps(self._sanitize_attributes(attributes))[1:-1].encode() + \
+            _SENSOR_ATTR_BYTES.get(key, b'') + b'}'
+
+        # Solo el sensor ancla lleva la información completa del dispositivo
+        if key == DEVICE_ANCHOR_KEY:
+            static = b'"device":' + self._device_info_bytes + b',' + static
+
+        return entity_id, static
+
+    def _ensure_device_info(self, device_id=None, version=None):
+        """
+        Obtengo la información del dispositivo, reconstruyéndola solo si cambian
+        device_id o version.
+
+        Al reconstruirla la sanitizo, la marco como limpia y la serializo una
+        sola vez. También invalido lo que depende de ella: los esqueletos JSON
+        y los últimos valores enviados.
+
+        Args:
+            device_id: ID del dispositivo leído del controlador, None para
+                       reutilizar la información actual o usar self.DEVICE_ID
+            version: Versión del controlador
+
+        Returns:
+            dict: Información del dispositivo
+        """
+        if device_id is None:
+            if self.device_info is not None:
+                return self.device_info
+
+            # Si no hay información del dispositivo, creo una predeterminada usando el ID del dispositivo
+            device_id = self.DEVICE_ID
+            version = "unknown"
+
+            if _DEBUG and self.DEBUG:
+                print(f"Advertencia: No hay información de dispositivo, usando valores predeterminados con ID {device_id}")
+
+        key = (device_id, version)
+
+        if key == self._device_info_key:
+            return self.device_info
+
+        # Olvido el id del anterior, ya no se usa
+        if self.device_info is not None:
+            self._clean_cache.discard(id(self.device_info))
+
+        self.device_info = self._sanitize_attributes({
+            "identifiers": [f"renogy_rover_li_{device_id}"],
+            "name": f"Controlador Solar Renogy Rover Li {device_id}",
+            "manufacturer": "Renogy",
+            "model": "Rover Li",
+            "sw_version": version,
+            "suggested_area": "Exterior"
+        })
+        self._clean_cache.add(id(self.device_info))
+        self._device_info_bytes = ujson.dumps(self.device_info).encode()
+        self._device_info_key = key
+
+        # Con un dispositivo nuevo los esqueletos no sirven y vuelvo a enviar todos los sensores
+        self._skeleton_cache = {}
+        self._last_values = {}
+
+        return self.device_info
     
     def verify_device_exists(self):
         """
@@ -463,38 +977,25 @@ class HomeAssistantConnection:
         Returns:
             bool: True si el dispositivo existe, False en caso contrario
         """
-        if not self.device_info:
-            # Si no hay información del dispositivo, creo una predeterminada usando el ID del dispositivo
-            self.device_info = {
-                "identifiers": [f"renogy_rover_li_{self.DEVICE_ID}"],
-                "name": f"Controlador Solar Renogy Rover Li {self.DEVICE_ID}",
-                "manufacturer": "Renogy",
-                "model": "Rover Li",
-                "sw_version": "unknown",
-                "suggested_area": "Exterior"
-            }
-            if self.DEBUG:
-                print(f"Advertencia: No hay información de dispositivo para verificar, usando valores predeterminados con ID {self.DEVICE_ID}")
+        # Reutilizo la información del dispositivo o creo una predeterminada
+        self._ensure_device_info()
             
         # Creo un ID de entidad para el dispositivo basado en el identificador del dispositivo
         device_identifier = self.device_info["identifiers"][0]
         entity_id = f"sensor.{device_identifier}_device"
         
         try:
-            url = f"{self.URL}{self.API_STATES_ENDPOINT}{entity_id}"
-            headers = self._get_headers()
-            
-            response = urequests.get(url, headers=headers)
+            status_code, _ = self._session.request("GET", self.API_STATES_ENDPOINT + entity_id, read_body=False)
             
-            if self.DEBUG:
+            if _DEBUG and self.DEBUG:
                 print(f"Verificando si existe el dispositivo: {entity_id}")
-                print(f"Estado de respuesta: {response.status_code}")
+                print(f"Estado de respuesta: {status_code}")
             
             # Si la respuesta es 200, el dispositivo existe
-            return response.status_code == 200
+            return status_code == 200
                 
         except Exception as e:
-            if self.DEBUG:
+            if _DEBUG and self.DEBUG:
                 print(f"Error al verificar si existe el dispositivo: {e}")
             return False
     
@@ -511,138 +1012,176 @@ class HomeAssistantConnection:
             bool: True si la entidad se creó correctamente o no necesitaba actualización,
                  False en caso contrario
         """
-        if not self.device_info:
-            # Si no hay información del dispositivo, creo una predeterminada usando el ID del dispositivo
-            self.device_info = {
-                "identifiers": [f"renogy_rover_li_{self.DEVICE_ID}"],
-                "name": f"Controlador Solar Renogy Rover Li {self.DEVICE_ID}",
-                "manufacturer": "Renogy",
-                "model": "Rover Li",
-                "sw_version": "unknown",
-                "suggested_area": "Exterior"
-            }
-            if self.DEBUG:
-                print(f"Advertencia: No hay información de dispositivo para crear la entidad, usando valores predeterminados con ID {self.DEVICE_ID}")
+        # Reutilizo la información del dispositivo o creo una predeterminada
+        self._ensure_device_info()
             
-        # Obtengo el tiempo actual
-        current_time = time.time()
+        # Uso el reloj monotónico para el intervalo, time.time() puede no estar
+        # en hora en placas sin RTC sincronizado
+        now_ms = time.ticks_ms()
         
-        # Verifico si ha pasado suficiente tiempo desde la última actualización
-        time_since_last_update = current_time - self.last_device_update
-        
-        # Si no ha pasado suficiente tiempo, no actualizo la entidad
-        if time_since_last_update < self.device_update_interval and self.last_device_update > 0:
-            if self.DEBUG:
-                print(f"No se actualiza la entidad del dispositivo. Próxima actualización en {self.device_update_interval - time_since_last_update} segundos")
-            return True  # Devuelvo True porque no es un error, simplemente no es necesario actualizar
+        # Si no ha pasado suficiente tiempo desde la última actualización, no actualizo la entidad
+        if self.last_device_update is not None:
+            elapsed_ms = time.ticks_diff(now_ms, self.last_device_update)
+
+            if elapsed_ms < self.device_update_interval * 1000:
+                if _DEBUG and self.DEBUG:
+                    print(f"No se actualiza la entidad del dispositivo. Próxima actualización en {self.device_update_interval - elapsed_ms // 1000} segundos")
+                return True  # Devuelvo True porque no es un error, simplemente no es necesario actualizar
             
         # Creo un ID de entidad para el dispositivo basado en el identificador del dispositivo
         device_identifier = self.device_info["identifiers"][0]
         entity_id = f"sensor.{device_identifier}_device"
         
-        # Creo atributos para la entidad
+        # Creo atributos para la entidad, la información del dispositivo la
+        # añado después ya serializada
         attributes = {
             "friendly_name": self.device_info["name"],
             "device_class": "timestamp",
-            "device": self.device_info,
             "unique_id": f"{self.device_info['identifiers'][0]}_device",
             "icon": "mdi:solar-power",
             "last_update_interval": self.device_update_interval  # Añado el intervalo como atributo para referencia
         }
         
         # El estado será la fecha y hora actual
-        state = current_time
+        state = time.time()
+
+        try:
+            body = b'{"state":' + ujson.dumps(state).encode() + b',"attributes":{"device":' + \
+                self._device_info_bytes + b',' + \
+                ujson.dumps(self._sanitize_attributes(attributes))[1:].encode() + b'}'
+        except Exception as e:
+            if _DEBUG and self.DEBUG:
+                print(f"Error al preparar la entidad del dispositivo {entity_id}: {e}")
+            return False
         
         # Actualizo la entidad en Home Assistant
-        result = self.update_sensor(entity_id, state, attributes)
+        result = self._post_state(entity_id, body)
         
         # Si la actualización fue exitosa, actualizo el timestamp de última actualización
         if result:
-            self.last_device_update = current_time
-            if self.DEBUG:
+            self.last_device_update = now_ms
+            if _DEBUG and self.DEBUG:
                 print(f"Entidad del dispositivo actualizada. Próxima actualización en {self.device_update_interval} segundos")
         
         return result
     
-    def update_microcontroller_sensors(self):
+    def queue_microcontroller_sensors(self):
         """
-        Actualizo los sensores para el estado del microcontrolador en Home Assistant.
-        
-        Returns:
-            bool: True si al menos un sensor se actualizó correctamente, False en caso contrario
+        Añado a la cola los sensores del estado del microcontrolador para
+        enviarlos en el mismo lote que el resto en el próximo flush().
         """
         # Obtengo el estado del microcontrolador
         status = self._get_microcontroller_status()
+
+        # Leo la hora una sola vez para todos los sensores del ciclo
+        now = time.time()
         
-        # Hago seguimiento del éxito de las actualizaciones
-        success = False
-        
-        # Verifico si tenemos información del dispositivo almacenada
-        if not self.device_info:
-            # Si no hay información del dispositivo, creo una predeterminada
-            default_device_id = 1  # Valor predeterminado para device_id
-            self.device_info = {
-                "identifiers": [f"renogy_rover_li_{default_device_id}"],
-                "name": f"Controlador Solar Renogy Rover Li {default_device_id}",
-                "manufacturer": "Renogy",
-                "model": "Rover Li",
-                "sw_version": "unknown",
-                "suggested_area": "Exterior"
-            }
-            if self.DEBUG:
-                print("Advertencia: No hay información de dispositivo almacenada, usando valores predeterminados")
-        
-        # Atributos comunes para todos los sensores
+        # Reutilizo la información del dispositivo o creo una predeterminada
+        self._ensure_device_info()
+        
+        # Atributos comunes para todos los sensores. Los agrupo en el dispositivo
+        # mediante el unique_id, la información completa va en la entidad del dispositivo
         common_attributes = {
-            "last_update": time.time(),
-            "device_class": "temperature",
-            "unit_of_measurement": "C",
-            "state_class": "measurement",
-            "friendly_name": "Temperatura del Microcontrolador",
-            "device": self.device_info,  # Añado información del dispositivo para agrupar sensores
-            "unique_id": f"{self.device_info['identifiers'][0]}_microcontroller_temperature"  # Añado unique_id para permitir la gestión desde la UI
+            "last_update": now
         }
+        identifier = self.device_info['identifiers'][0]
+
+        # Reutilizo el mismo diccionario para los atributos de cada sensor,
+        # queue_sensor lo serializa en el momento y no lo guarda
+        attributes = self._attr_scratch
+        queue_sensor = self.queue_sensor
         
-        # Actualizo el sensor de temperatura
-        if self.update_sensor("sensor.microcontroller_temperature", status["temperature"], common_attributes):
-            success = True
+        # Sensor de temperatura
+        attributes.clear()
+        attributes.update(common_attributes)
+        attributes["device_class"] = "temperature"
+        attributes["unit_of_measurement"] = "C"
+        attributes["state_class"] = "measurement"
+        attributes["friendly_name"] = "Temperatura del Microcontrolador"
+        attributes["unique_id"] = f"{identifier}_microcontroller_temperature"  # Añado unique_id para permitir la gestión desde la UI
+
+        queue_sensor("sensor.microcontroller_temperature", status["temperature"], attributes)
         
-        # Actualizo el sensor de estado WiFi
-        wifi_attributes = {
-            "last_update": time.time(),
-            "friendly_name": "Estado WiFi del Microcontrolador",
-            "device": self.device_info,  # Añado información del dispositivo para agrupar sensores
-            "unique_id": f"{self.device_info['identifiers'][0]}_microcontroller_wifi"  # Añado unique_id para permitir la gestión desde la UI
-        }
-        if self.update_sensor("binary_sensor.microcontroller_wifi", "on" if status["wifi_connected"] else "off", wifi_attributes):
-            success = True
+        # Sensor de estado WiFi
+        attributes.clear()
+        attributes.update(common_attributes)
+        attributes["friendly_name"] = "Estado WiFi del Microcontrolador"
+        attributes["unique_id"] = f"{identifier}_microcontroller_wifi"
+
+        queue_sensor("binary_sensor.microcontroller_wifi", "on" if status["wifi_connected"] else "off", attributes)
         
-        # Actualizo el sensor de intensidad de señal WiFi si está disponible
+        # Sensor de intensidad de señal WiFi si está disponible
         if status["wifi_connected"] and status["wifi_signal_strength"] is not None:
-            signal_attributes = {
-                "last_update": time.time(),
-                "unit_of_measurement": "dBm",
-                "device_class": "signal_strength",
-                "state_class": "measurement",
-                "friendly_name": "Senal WiFi del Microcontrolador",
-                "device": self.device_info,  # Añado información del dispositivo para agrupar sensores
-                "unique_id": f"{self.device_info['identifiers'][0]}_microcontroller_wifi_signal"  # Añado unique_id para permitir la gestión desde la UI
-            }
-            if self.update_sensor("sensor.microcontroller_wifi_signal", status["wifi_signal_strength"], signal_attributes):
-                success = True
-        
-        # Actualizo el sensor de batería si está disponible
+            attributes.clear()
+            attributes.update(common_attributes)
+            attributes["unit_of_measurement"] = "dBm"
+            attributes["device_class"] = "signal_strength"
+            attributes["state_class"] = "measurement"
+            attributes["friendly_name"] = "Senal WiFi del Microcontrolador"
+            attributes["unique_id"] = f"{identifier}_microcontroller_wifi_signal"
+
+            queue_sensor("sensor.microcontroller_wifi_signal", status["wifi_signal_strength"], attributes)
+        
+        # Sensor de batería si está disponible
         if "battery_percentage" in status:
-            battery_attributes = {
-                "last_update": time.time(),
-                "unit_of_measurement": "%",
-                "device_class": "battery",
-                "state_class": "measurement",
-                "friendly_name": "Batería del Microcontrolador",
-                "device": self.device_info,  # Añado información del dispositivo para agrupar sensores
-                "unique_id": f"{self.device_info['identifiers'][0]}_microcontroller_battery"  # Añado unique_id para permitir la gestión desde la UI
-            }
-            if self.update_sensor("sensor.microcontroller_battery", status["battery_percentage"], battery_attributes):
-                success = True
-        
-        return success
\ No newline at end of file
+            attributes.clear()
+            attributes.update(common_attributes)
+            attributes["unit_of_measurement"] = "%"
+            attributes["device_class"] = "battery"
+            attributes["state_class"] = "measurement"
+            attributes["friendly_name"] = "Batería del Microcontrolador"
+            attributes["unique_id"] = f"{identifier}_microcontroller_battery"
+
+            queue_sensor("sensor.microcontroller_battery", status["battery_percentage"], attributes)
+
+        # Vacío el diccionario reutilizable
+        attributes.clear()
+
+    def update_microcontroller_sensors(self):
+        """
+        Actualizo los sensores para el estado del microcontrolador en Home Assistant.
+
+        Se mantiene por compatibilidad, update_solar_controller_data() ya los
+        envía en su mismo lote. Aquí los añado a la cola y la envío.
+        
+        Returns:
+            bool: True si al menos un sensor se actualizó correctamente, False en caso contrario
+        """
+        self.queue_microcontroller_sensors()
+
+        return bool(self.flush())
+
+
+def _build_sensor_attr_bytes(metadata):
+    """
+    Serializo los metadatos no nulos de un sensor como fragmento JSON.
+
+    Args:
+        metadata (dict): Unidad, device_class y state_class del sensor
+
+    Returns:
+        bytes: Fragmento ',"clave":"valor"...' o vacío si no tiene metadatos
+    """
+    parts = []
+
+    for name in ("unit_of_measurement", "device_class", "state_class"):
+        value = metadata[name]
+
+        if value:
+            parts.append(',"' + name + '":' + ujson.dumps(value))
+
+    return "".join(parts).encode()
+
+
+# Metadatos de cada sensor ya serializados y tolerancia según su unidad,
+# SENSOR_METADATA no cambia
+_SENSOR_ATTR_BYTES = {}
+_SENSOR_TOLERANCE = {}
+
+for _key, _metadata in HomeAssistantConnection.SENSOR_METADATA.items():
+    _SENSOR_ATTR_BYTES[_key] = _build_sensor_attr_bytes(_metadata)
+
+    if _metadata["unit_of_measurement"] in DELTA_TOLERANCE:
+        _SENSOR_TOLERANCE[_key] = DELTA_TOLERANCE[_metadata["unit_of_measurement"]]
+
+del _key, _metadata
@@ -0,0 +1,530 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# @author     Raúl Caro Pastorino
+# @email      public@raupulus.dev
+# @web        https://raupulus.dev
+# @gitlab     https://gitlab.com/raupulus
+# @github     https://github.com/raupulus
+# @twitter    https://twitter.com/raupulus
+# @telegram   https://t.me/raupulus_diffusion
+#
+# Create Date: 2025
+# Project Name: Raspberry Pi Pico Monitor Renogy Rover Li Solar Controller
+# Description: Sesión HTTP/1.1 con conexión persistente (keep-alive) para
+#              encadenar varias peticiones sobre el mismo socket.
+#
+# Dependencies: MicroPython, socket, ssl
+#
+# Revision 0.01 - Versión inicial
+# Additional Comments: urequests abre y cierra un socket (y negociación TLS)
+#                      por cada petición, aquí lo reutilizo mientras el
+#                      servidor lo mantenga abierto.
+#
+# @copyright  Copyright © 2025 Raúl Caro Pastorino
+# @license    https://wwww.gnu.org/licenses/gpl.txt
+#
+# Copyright (C) 2025  Raúl Caro Pastorino
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+import socket
+import time
+import gc
+import micropython
+from micropython import const
+import random
+
+try:
+    import ssl
+except ImportError:
+    import ussl as ssl
+
+# Mensajes de depuración, al compilar con "make mpy" lo fijo a False y se
+# omite todo el código de depuración (make mpy DEBUG=1 para conservarlo)
+_DEBUG = const(True)
+
+# Configuraciones predeterminadas
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.3
+DEFAULT_TIMEOUT = 10
+RECV_BUFFER_SIZE = 512  # Tamaño del buffer reutilizable para descartar respuestas
+
+# Códigos de estado que considero una respuesta correcta
+SUCCESS_STATUS = (200, 201)
+
+# Códigos de estado que nunca llevan cuerpo (además de los 1xx), el servidor
+# no cierra la conexión tras ellos así que no debo esperar a leerlo
+NO_BODY_STATUS = (204, 304)
+
+# Códigos de estado transitorios (límite de peticiones, servidor reiniciando)
+# tras los que merece la pena repetir la petición
+RETRY_STATUS = (429, 502, 503, 504)
+
+# Espera máxima que acepto de la cabecera Retry-After
+MAX_RETRY_AFTER_MS = 30000
+
+# Valor de read_body para guardar el cuerpo solo si la respuesta es correcta,
+# el de los errores (páginas HTML, mensajes) se descarta sin ocupar memoria
+BODY_IF_OK = "ok"
+
+
+@micropython.viper
+def backoff_ms(base_ms: int, attempt: int) -> int:
+    """
+    Calculo la espera en milisegundos del retroceso exponencial para un intento.
+
+    Args:
+        base_ms (int): Espera base en milisegundos
+        attempt (int): Número de intento empezando por 0
+
+    Returns:
+        int: Milisegundos a esperar (base_ms * 2^attempt)
+    """
+    return base_ms << attempt
+
+
+class HttpSession:
+    """
+    Una sesión HTTP/1.1 que mantiene abierto el socket entre peticiones.
+
+    Escribo a mano la línea de petición y las cabeceras con
+    "Connection: keep-alive" para que varias peticiones seguidas al mismo
+    servidor compartan la conexión TCP (y TLS si es https).
+
+    Args:
+        url: La URL base del servidor (ej., "http://homeassistant.local:8123").
+        headers: Cabeceras comunes que se envían en todas las peticiones.
+        retries: Número de reintentos para solicitudes fallidas.
+        backoff_factor: Factor de retroceso para reintentos.
+        timeout: Tiempo de espera del socket en segundos.
+        debug: Bandera booleana opcional para modo de depuración.
+    """
+
+    def __init__(self, url, headers=None, retries=DEFAULT_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, timeout=DEFAULT_TIMEOUT,
+                 debug=False):
+        self.DEBUG = debug
+        self.RETRIES = retries
+        self.BACKOFF_FACTOR = backoff_factor
+        self.TIMEOUT = timeout
+
+        # Precalculo las esperas de cada reintento en milisegundos, no cambian
+        base_ms = int(backoff_factor * 1000)
+        self._backoff_steps = tuple(backoff_ms(base_ms, attempt) for attempt in range(retries))
+
+        # Separo esquema, host, puerto y ruta base de la URL
+        scheme, _, rest = url.partition("://")
+        host, _, base_path = rest.partition("/")
+
+        self.USE_SSL = scheme == "https"
+        port = 443 if self.USE_SSL else 80
+
+        if ":" in host:
+            host, port = host.split(":", 1)
+            port = int(port)
+
+        self.HOST = host
+        self.PORT = port
+        self.BASE_PATH = "/" + base_path.rstrip("/") if base_path else ""
+
+        # Precalculo el bloque de cabeceras comunes, no cambia entre peticiones
+        host_header = host if port in (80, 443) else "%s:%d" % (host, port)
+        lines = "Host: %s\r\nConnection: keep-alive\r\n" % host_header
+
+        if headers:
+            for key, value in headers.items():
+                lines += "%s: %s\r\n" % (key, value)
+
+        self._headers_block = lines.encode()
+
+        self._addr = None
+        self._sock = None
+
+        # Segundos pedidos por el servidor en "Retry-After" en la última
+        # respuesta, 0 si no la envió
+        self.retry_after = 0
+
+        # Líneas de petición ya codificadas por (método, ruta), las rutas son siempre las mismas
+        self._line_cache = {}
+
+        # Buffer de recepción reutilizable para descartar cuerpos sin asignar memoria
+        self._recv_buf = bytearray(RECV_BUFFER_SIZE)
+        self._recv_mv = memoryview(self._recv_buf)
+
+        # Ajusto el umbral del recolector para que actúe con ~25% del heap libre
+        # ocupado en lugar de esperar a que se agote en mitad de una petición.
+        # Solo lo ajusto si nadie lo ha configurado antes (-1 = desactivado).
+        if gc.threshold() < 0:
+            gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+
+    def collect(self):
+        """
+        Ejecuto la recolección de basura tras terminar un envío.
+        """
+        if _DEBUG and self.DEBUG:
+            mem_before = gc.mem_free()
+
+        gc.collect()
+
+        if _DEBUG and self.DEBUG:
+            print(f"Memoria liberada tras el envío: {gc.mem_free() - mem_before} bytes")
+
+    def _connect(self):
+        """
+        Abro el socket contra el servidor, resolviendo el DNS solo la primera vez.
+        """
+        if self._addr is None:
+            self._addr = socket.getaddrinfo(self.HOST, self.PORT, 0, socket.SOCK_STREAM)[0][-1]
+
+        sock = socket.socket()
+        sock.settimeout(self.TIMEOUT)
+
+        try:
+            sock.connect(self._addr)
+
+            if self.USE_SSL:
+                sock = ssl.wrap_socket(sock, server_hostname=self.HOST)
+        except Exception:
+            sock.close()
+            raise
+
+        self._sock = sock
+
+        if _DEBUG and self.DEBUG:
+            print(f"Sesión HTTP conectada a {self.HOST}:{self.PORT}")
+
+    def close(self):
+        """
+        Cierro el socket si estuviera abierto.
+        """
+        if self._sock:
+            try:
+                self._sock.close()
+            except Exception:
+                pass
+
+            self._sock = None
+
+    def _read_exact(self, sock, length):
+        """
+        Leo exactamente length bytes del socket.
+
+        Args:
+            sock: Socket del que leer
+            length (int): Número de bytes a leer
+
+        Returns:
+            bytes: Datos leídos
+        """
+        data = b""
+
+        while len(data) < length:
+            chunk = sock.read(length - len(data))
+
+            if not chunk:
+                raise OSError("Conexión cerrada antes de completar la respuesta")
+
+            data += chunk
+
+        return data
+
+    def _drain(self, sock, length=-1):
+        """
+        Descarto length bytes del socket (o hasta que se cierre si es -1)
+        leyéndolos sobre el buffer reutilizable.
+
+        Args:
+            sock: Socket del que leer
+            length (int): Número de bytes a descartar, -1 para leer hasta el cierre
+        """
+        mv = self._recv_mv
+        size = len(mv)
+
+        while length:
+            n = sock.readinto(mv[:length] if 0 < length < size else mv)
+
+            if not n:
+                if length > 0:
+                    raise OSError("Conexión cerrada antes de completar la respuesta")
+                break
+
+            if length > 0:
+                length -= n
+
+    def _read_response(self, sock, read_body=True):
+        """
+        Leo la respuesta completa del servidor.
+
+        Args:
+            sock: Socket del que leer
+            read_body (bool): Si es False descarto el cuerpo sin guardarlo, con
+                              BODY_IF_OK solo lo guardo si la respuesta es correcta
+
+        Returns:
+            tuple: (código de estado, cuerpo en bytes, True si debo cerrar la conexión)
+        """
+        # Enlazo readline a un nombre local, lo llamo una vez por cabecera
+        readline = sock.readline
+
+        status_line = readline()
+
+        if len(status_line) < 12:
+            raise OSError("Sin respuesta del servidor")
+
+        # "HTTP/1.1 200 OK": leo directamente los tres dígitos del código
+        status = int(status_line[9:12])
+        self.retry_after = 0
+
+        if read_body == BODY_IF_OK:
+            read_body = status in SUCCESS_STATUS
+
+        content_length = None
+        chunked = False
+        must_close = False
+
+        # Recorro las cabeceras hasta la línea vacía
+        while True:
+            line = readline()
+
+            if not line or line == b"\r\n":
+                break
+
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            value = value.strip()
+
+            if name == b"content-length":
+                content_length = int(value)
+            elif name == b"transfer-encoding" and value.lower() == b"chunked":
+                chunked = True
+            elif name == b"connection" and value.lower() == b"close":
+                must_close = True
+            elif name == b"retry-after" and value.isdigit():
+                # Solo entiendo el formato en segundos, ignoro el de fecha
+                self.retry_after = int(value)
+
+        # Leo el cuerpo según la forma en la que lo envía el servidor. Si no lo
+        # necesito lo descarto igualmente para dejar el socket listo para reutilizarlo
+        body = b"" if read_body else None
+
+        if status < 200 or status in NO_BODY_STATUS:
+            # Respuesta sin cuerpo aunque no indique longitud, la conexión sigue abierta
+            pass
+        elif chunked:
+            while True:
+                size = int(readline().split(b";")[0].strip(), 16)
+
+                if size == 0:
+                    # Descarto las cabeceras finales hasta la línea vacía
+                    while readline() not in (b"\r\n", b""):
+                        pass
+                    break
+
+                if read_body:
+                    body += self._read_exact(sock, size)
+                else:
+                    self._drain(sock, size)
+
+                readline()
+        elif content_length is not None:
+            if read_body:
+                body = self._read_exact(sock, content_length)
+            elif content_length:
+                self._drain(sock, content_length)
+        else:
+            # Sin longitud conocida, el servidor cerrará la conexión al terminar
+            if read_body:
+                body = sock.read()
+            else:
+                self._drain(sock)
+
+            must_close = True
+
+        return status, body, must_close
+
+    def _build_head(self, method, path, body=None):
+        """
+        Preparo la línea de petición y las cabeceras ya codificadas.
+
+        Args:
+            method (str): Método HTTP (GET, POST...)
+            path (str): Ruta relativa a la URL base
+            body (bytes, opcional): Cuerpo de la petición
+
+        Returns:
+            bytes: Cabecera completa de la petición terminada en línea vacía
+        """
+        key = (method, path)
+        line = self._line_cache.get(key)
+
+        if line is None:
+            line = ("%s %s%s HTTP/1.1\r\n" % (method, self.BASE_PATH, path)).encode()
+            self._line_cache[key] = line
+
+        if body is not None:
+            line += ("Content-Length: %d\r\n" % len(body)).encode()
+
+        return line + self._headers_block + b"\r\n"
+
+    def request(self, method, path, body=None, read_body=True):
+        """
+        Realizo una petición HTTP reutilizando la conexión abierta.
+
+        Args:
+            method (str): Método HTTP (GET, POST...)
+            path (str): Ruta relativa a la URL base
+            body (str|bytes, opcional): Cuerpo de la petición
+            read_body (bool): Si es False descarto el cuerpo de la respuesta (ver BODY_IF_OK)
+
+        Returns:
+            tuple: (código de estado, cuerpo de la respuesta en bytes o None)
+        """
+        if isinstance(body, str):
+            body = body.encode()
+
+        return self._exchange(self._build_head(method, path, body), body, read_body)
+
+    def _exchange(self, head, body=None, read_body=True):
+        """
+        Envío una petición ya preparada y leo su respuesta.
+
+        Si el socket reutilizado estaba caducado (el servidor lo cerró),
+        reconecto una vez y repito la petición.
+
+        Args:
+            head (bytes): Línea de petición y cabeceras
+            body (bytes, opcional): Cuerpo de la petición
+            read_body (bool): Si es False descarto el cuerpo de la respuesta (ver BODY_IF_OK)
+
+        Returns:
+            tuple: (código de estado, cuerpo de la respuesta en bytes o None)
+        """
+        for attempt in range(2):
+            reused = self._sock is not None
+
+            try:
+                if not reused:
+                    self._connect()
+
+                sock = self._sock
+                sock.write(head)
+
+                if body:
+                    sock.write(body)
+
+                status, data, must_close = self._read_response(sock, read_body)
+
+                if must_close:
+                    self.close()
+
+                return status, data
+
+            except Exception as e:
+                self.close()
+
+                # Solo repito si el fallo fue sobre un socket reutilizado
+                if not reused or attempt:
+                    raise
+
+                if _DEBUG and self.DEBUG:
+                    print(f"Conexión caducada, reconectando: {e}")
+
+    def retry_wait_ms(self):
+        """
+        Devuelvo la espera en milisegundos pedida por el servidor con
+        "Retry-After" en la última respuesta, limitada a MAX_RETRY_AFTER_MS.
+
+        Returns:
+            int: Milisegundos a esperar, 0 si no la pidió
+        """
+        return min(self.retry_after * 1000, MAX_RETRY_AFTER_MS)
+
+    def request_with_retry(self, method, path, body=None, read_body=True):
+        """
+        Realizo una petición con reintentos y retroceso exponencial.
+
+        Solo repito la petición si falla la conexión o el estado es transitorio
+        (ver RETRY_STATUS), el resto de errores (401, 404...) no mejoran
+        repitiéndola y los devuelvo en el primer intento.
+
+        Args:
+            method (str): Método HTTP (GET, POST...)
+            path (str): Ruta relativa a la URL base
+            body (str|bytes, opcional): Cuerpo de la petición
+            read_body (bool): Si es False descarto el cuerpo de la respuesta (ver BODY_IF_OK)
+
+        Returns:
+            tuple: (True si la respuesta fue correcta, cuerpo de la respuesta en
+                    bytes o None, código de estado de la última respuesta o None
+                    si no hubo respuesta)
+        """
+        # Copio a variables locales los atributos usados dentro del bucle
+        debug = _DEBUG and self.DEBUG
+        retries = self.RETRIES
+        backoff_steps = self._backoff_steps
+
+        # Enlazo a nombres locales las funciones llamadas en el bucle
+        exchange = self._exchange
+        collect = gc.collect
+        sleep_ms = time.sleep_ms
+        getrandbits = random.getrandbits
+
+        if isinstance(body, str):
+            body = body.encode()
+
+        # La cabecera es la misma en todos los intentos, la preparo una sola vez
+        head = self._build_head(method, path, body)
+
+        status_code = None
+
+        for attempt in range(retries):
+            try:
+                status_code, data = exchange(head, body, read_body)
+
+                if debug:
+                    print(f"Estado de Respuesta {method} {path}: {status_code}")
+
+                # Compruebo si la respuesta es exitosa
+                if status_code in SUCCESS_STATUS:
+                    return True, data, status_code
+
+                if debug:
+                    print(f"Estado de Error (intento {attempt+1}/{retries}): {status_code}")
+                    print(f"Texto de Respuesta: {data}")
+
+                # Los errores que no son transitorios no los reintento
+                if status_code not in RETRY_STATUS:
+                    return False, data, status_code
+
+            except Exception as e:
+                status_code = None
+
+                if debug:
+                    print(f"Error en la petición {method} {path} (intento {attempt+1}/{retries}): {e}")
+
+            # Tras el último intento no espero, devuelvo el fallo directamente
+            if attempt + 1 >= retries:
+                break
+
+            # Libero la memoria del intento fallido y espero con retroceso
+            # exponencial, sumando hasta un 50% aleatorio para no reconectar
+            # todos los dispositivos a la vez cuando el servidor vuelve. Si
+            # el servidor pidió esperar más con Retry-After, le hago caso
+            collect()
+            step = backoff_steps[attempt]
+            sleep_ms(max(step + getrandbits(16) % (step // 2 + 1), self.retry_wait_ms()))
+
+        # Todos los reintentos fallaron
+        return False, None, status_code
@@ -39,36 +39,272 @@
 
 # Guía de estilos aplicada: PEP8
 
-from Models.SerialConnection import SerialConnection
-from time import sleep, localtime
+from Models.SerialConnection import SerialConnection, build_frame, DEFAULT_BAUDRATE
+from time import localtime, ticks_ms, ticks_diff, ticks_add
+import struct
+from micropython import const
+
+# Mensajes de depuración, al compilar con "make mpy" lo fijo a False y se
+# omite todo el código de depuración (make mpy DEBUG=1 para conservarlo)
+_DEBUG = const(True)
+
+# Bloque contiguo de registros con los datos en vivo, del día e históricos
+# (0x0100 - 0x0120), lo leo en una sola petición Modbus
+LIVE_BLOCK_START = 0x0100
+LIVE_BLOCK_COUNT = 33
+LIVE_CACHE_TTL_MS = 5000  # Vigencia del bloque leído, cubre todas las lecturas de un ciclo
+SERIAL_TIMEOUT_MIN = 0.02  # Segundos, timeout mínimo del UART a velocidades altas
+FALLBACK_BAUDRATE = DEFAULT_BAUDRATE  # Velocidad de fábrica del controlador, la uso si la configurada no responde
+ERROR_COOLDOWN_MS = 2000  # Pausa sin acceder al UART tras una lectura fallida
+LIVE_SPLIT_COUNT = 16  # Registros por petición si el controlador no acepta el bloque completo
+
+# Niveles de sondeo: 'fast' se lee en cada ciclo, 'slow' por turnos un
+# sub-bloque por ciclo y 'static' solo una vez (se guarda en caché)
+TIERS = ('fast', 'slow', 'static')
+POLL_GAP_TOLERANCE = 2  # Registros sin usar que acepto leer para no partir un bloque
+POLL_SLOW_MAX_COUNT = 11  # Registros máximos por sub-bloque lento
+# Datos estáticos que guardo en caché, se pueden indicar con preset= al instanciar
+STATIC_FIELDS = ('version', 'hardware', 'serial_number', 'system_voltage_current',
+                 'battery_type', 'nominal_battery_capacity')
+
+# Voltaje solar (decivoltios, como lo devuelve get_solar_voltage()) para el
+# 0 % y el 100 % del brillo de la luz de calle
+_LIGHT_MIN_VOLTAGE = const(123)
+_LIGHT_MAX_VOLTAGE = const(415)
+_LIGHT_VOLTAGE_RANGE = const(_LIGHT_MAX_VOLTAGE - _LIGHT_MIN_VOLTAGE)
+
+RX_BUFFER_SIZE = 80  # Búfer de recepción, cabe la respuesta del bloque en vivo (71 bytes)
+
+# Tipos de dato de los campos del controlador
+_TYPE_INT = const(0)
+_TYPE_FLOAT = const(1)
+_TYPE_STRING = const(2)
+_TYPE_BOOL = const(3)
+
+# Campos del controlador: (dirección, número de registros, tipo de dato). Los
+# campos comentados no necesitan decodificación, su getter se genera al final
+# del módulo y devuelve el registro tal cual
+_SEC_MODEL = (0x12, 8, _TYPE_STRING)
+_SEC_SYSTEM_VOLTAGE_CURRENT = (0xa, 2, _TYPE_FLOAT)
+_SEC_SYSTEM_INTENSITY_CURRENT = (0xa, 2, _TYPE_FLOAT)
+_SEC_HARDWARE = (0x14, 4, _TYPE_STRING)
+_SEC_VERSION = (0x14, 4, _TYPE_STRING)
+_SEC_SERIAL_NUMBER = (0x18, 4, _TYPE_STRING)
+_SEC_BATTERY_PERCENTAGE = (0x100, 2, _TYPE_FLOAT)  # Carga de la batería (%)
+_SEC_BATTERY_VOLTAGE = (0x101, 2, _TYPE_FLOAT)  # Voltaje de la batería (decivoltios)
+_SEC_BATTERY_TEMPERATURE = (0x103, 2, _TYPE_FLOAT)
+_SEC_CONTROLLER_TEMPERATURE = (0x103, 2, _TYPE_FLOAT)
+_SEC_LOAD_VOLTAGE = (0x104, 2, _TYPE_FLOAT)  # Voltaje de la carga (decivoltios)
+_SEC_LOAD_CURRENT = (0x105, 2, _TYPE_FLOAT)  # Intensidad de la carga (centiamperios)
+_SEC_LOAD_POWER = (0x106, 2, _TYPE_FLOAT)  # Potencia de la carga (W)
+_SEC_SOLAR_VOLTAGE = (0x107, 2, _TYPE_FLOAT)  # Voltaje del panel solar (decivoltios)
+_SEC_SOLAR_CURRENT = (0x108, 2, _TYPE_FLOAT)  # Intensidad del panel solar (centiamperios)
+_SEC_SOLAR_POWER = (0x109, 2, _TYPE_FLOAT)  # Potencia del panel solar (W)
+_SEC_TODAY_BATTERY_MIN_VOLTAGE = (0x010B, 2, _TYPE_FLOAT)  # Voltaje mínimo de la batería hoy (decivoltios)
+_SEC_TODAY_BATTERY_MAX_VOLTAGE = (0x010C, 2, _TYPE_FLOAT)  # Voltaje máximo de la batería hoy (decivoltios)
+_SEC_TODAY_MAX_CHARGING_CURRENT = (0x010D, 2, _TYPE_FLOAT)  # Intensidad máxima de carga hoy (centiamperios)
+_SEC_TODAY_MAX_DISCHARGING_CURRENT = (0x010E, 2, _TYPE_FLOAT)  # Intensidad máxima de descarga hoy (centiamperios)
+_SEC_TODAY_MAX_CHARGING_POWER = (0x010D, 2, _TYPE_INT)  # Potencia máxima de carga hoy (W)
+_SEC_TODAY_MAX_DISCHARGING_POWER = (0x010E, 2, _TYPE_INT)  # Potencia máxima de descarga hoy (W)
+_SEC_TODAY_CHARGING_AMP_HOURS = (0x0111, 2, _TYPE_INT)  # Carga hoy (Ah)
+_SEC_TODAY_DISCHARGING_AMP_HOURS = (0x0112, 2, _TYPE_INT)  # Descarga hoy (Ah)
+_SEC_TODAY_POWER_GENERATION = (0x0113, 2, _TYPE_INT)  # Energía generada hoy (kWh / 10000)
+_SEC_TODAY_POWER_CONSUMPTION = (0x0114, 2, _TYPE_INT)  # Energía consumida hoy (kWh / 10000)
+_SEC_HISTORICAL_TOTAL_DAYS_OPERATING = (0x0115, 2, _TYPE_INT)  # Días operativo
+_SEC_HISTORICAL_TOTAL_NUMBER_BATTERY_OVER_DISCHARGES = (0x0116, 2, _TYPE_INT)  # Sobredescargas de la batería
+_SEC_HISTORICAL_TOTAL_NUMBER_BATTERY_FULL_CHARGES = (0x0117, 2, _TYPE_INT)  # Cargas completas de la batería
+_SEC_HISTORICAL_TOTAL_CHARGING_AMP_HOURS = (0x0118, 4, _TYPE_INT)  # Carga total de la batería (Ah)
+_SEC_HISTORICAL_TOTAL_DISCHARGING_AMP_HOURS = (0x011A, 4, _TYPE_INT)  # Descarga total de la batería (Ah)
+_SEC_HISTORICAL_CUMULATIVE_POWER_GENERATION = (0x011C, 4, _TYPE_INT)  # Energía generada acumulada (kWh / 10000)
+_SEC_HISTORICAL_CUMULATIVE_POWER_CONSUMPTION = (0x011E, 4, _TYPE_INT)  # Energía consumida acumulada (kWh / 10000)
+_SEC_STREET_LIGHT_STATUS = (0x0120, 2, _TYPE_BOOL)
+_SEC_STREET_LIGHT_BRIGHTNESS = (0x0120, 2, _TYPE_INT)
+_SEC_CHARGING_STATUS = (0x0120, 2, _TYPE_INT)
+_SEC_NOMINAL_BATTERY_CAPACITY = (0xE002, 2, _TYPE_INT)
+_SEC_BATTERY_TYPE = (0xE004, 2, _TYPE_INT)
+
+# Registros de los datos estáticos, los leo agrupados en prime_cache()
+STATIC_SECTIONS = (_SEC_SYSTEM_VOLTAGE_CURRENT, _SEC_HARDWARE, _SEC_VERSION,
+                   _SEC_SERIAL_NUMBER, _SEC_NOMINAL_BATTERY_CAPACITY, _SEC_BATTERY_TYPE)
+STATIC_GAP_TOLERANCE = 10  # Registros sin usar que acepto leer entre datos estáticos
+
+# Nivel de sondeo por defecto de los campos del bloque en vivo, los campos
+# fuera del bloque son estáticos y se guardan en caché
+_POLL_TIERS = (
+    ('battery_percentage', _SEC_BATTERY_PERCENTAGE, 'fast'),
+    ('battery_voltage', _SEC_BATTERY_VOLTAGE, 'fast'),
+    ('battery_temperature', _SEC_BATTERY_TEMPERATURE, 'fast'),
+    ('controller_temperature', _SEC_CONTROLLER_TEMPERATURE, 'fast'),
+    ('load_voltage', _SEC_LOAD_VOLTAGE, 'fast'),
+    ('load_current', _SEC_LOAD_CURRENT, 'fast'),
+    ('load_power', _SEC_LOAD_POWER, 'fast'),
+    ('solar_voltage', _SEC_SOLAR_VOLTAGE, 'fast'),
+    ('solar_current', _SEC_SOLAR_CURRENT, 'fast'),
+    ('solar_power', _SEC_SOLAR_POWER, 'fast'),
+    ('today_battery_min_voltage', _SEC_TODAY_BATTERY_MIN_VOLTAGE, 'slow'),
+    ('today_battery_max_voltage', _SEC_TODAY_BATTERY_MAX_VOLTAGE, 'slow'),
+    ('today_max_charging_current', _SEC_TODAY_MAX_CHARGING_CURRENT, 'slow'),
+    ('today_max_discharging_current', _SEC_TODAY_MAX_DISCHARGING_CURRENT, 'slow'),
+    ('today_max_charging_power', _SEC_TODAY_MAX_CHARGING_POWER, 'slow'),
+    ('today_max_discharging_power', _SEC_TODAY_MAX_DISCHARGING_POWER, 'slow'),
+    ('today_charging_amp_hours', _SEC_TODAY_CHARGING_AMP_HOURS, 'slow'),
+    ('today_discharging_amp_hours', _SEC_TODAY_DISCHARGING_AMP_HOURS, 'slow'),
+    ('today_power_generation', _SEC_TODAY_POWER_GENERATION, 'slow'),
+    ('today_power_consumption', _SEC_TODAY_POWER_CONSUMPTION, 'slow'),
+    ('historical_total_days_operating', _SEC_HISTORICAL_TOTAL_DAYS_OPERATING, 'slow'),
+    ('historical_total_number_battery_over_discharges', _SEC_HISTORICAL_TOTAL_NUMBER_BATTERY_OVER_DISCHARGES, 'slow'),
+    ('historical_total_number_battery_full_charges', _SEC_HISTORICAL_TOTAL_NUMBER_BATTERY_FULL_CHARGES, 'slow'),
+    ('historical_total_charging_amp_hours', _SEC_HISTORICAL_TOTAL_CHARGING_AMP_HOURS, 'slow'),
+    ('historical_total_discharging_amp_hours', _SEC_HISTORICAL_TOTAL_DISCHARGING_AMP_HOURS, 'slow'),
+    ('historical_cumulative_power_generation', _SEC_HISTORICAL_CUMULATIVE_POWER_GENERATION, 'slow'),
+    ('historical_cumulative_power_consumption', _SEC_HISTORICAL_CUMULATIVE_POWER_CONSUMPTION, 'slow'),
+    ('street_light_status', _SEC_STREET_LIGHT_STATUS, 'fast'),
+    ('street_light_brightness', _SEC_STREET_LIGHT_BRIGHTNESS, 'fast'),
+    ('charging_status', _SEC_CHARGING_STATUS, 'fast'),
+)
+
+# Divisor de los campos que guardo como enteros escalados (decivoltios y
+# centiamperios), get_<campo>() los devuelve en float y get_<campo>_raw() sin convertir
+SCALE = {
+    'battery_voltage': 10,
+    'load_voltage': 10,
+    'load_current': 100,
+    'solar_voltage': 10,
+    'solar_current': 100,
+    'today_battery_min_voltage': 10,
+    'today_battery_max_voltage': 10,
+    'today_max_charging_current': 100,
+    'today_max_discharging_current': 100,
+}
+
+
+# Campos de cada grupo de datos, en el orden en que se devuelven. Cada uno
+# se obtiene con su getter get_<campo>()
+TODAY_HISTORICAL_FIELDS = (
+    'today_battery_max_voltage', 'today_battery_min_voltage',
+    'today_max_charging_current', 'today_max_discharging_current',
+    'today_max_charging_power', 'today_charging_amp_hours',
+    'today_discharging_amp_hours', 'today_power_generation',
+    'today_power_consumption',
+)
+HISTORICAL_FIELDS = (
+    'historical_total_days_operating',
+    'historical_total_number_battery_over_discharges',
+    'historical_total_number_battery_full_charges',
+    'historical_total_charging_amp_hours',
+    'historical_total_discharging_amp_hours',
+    'historical_cumulative_power_generation',
+    'historical_cumulative_power_consumption',
+)
+CONTROLLER_FIELDS = (
+    'device_id', 'hardware', 'version', 'serial_number',
+    'system_voltage_current', 'system_intensity_current', 'battery_type',
+    'nominal_battery_capacity',
+)
+SOLAR_PANEL_FIELDS = ('solar_current', 'solar_voltage', 'solar_power')
+BATTERY_FIELDS = ('battery_voltage', 'battery_temperature', 'battery_percentage',
+                  'charging_status', 'charging_status_label')
+LOAD_FIELDS = ('load_voltage', 'load_current', 'load_power')
+ALL_FIELDS = (TODAY_HISTORICAL_FIELDS + HISTORICAL_FIELDS + CONTROLLER_FIELDS
+              + SOLAR_PANEL_FIELDS + BATTERY_FIELDS + LOAD_FIELDS
+              + ('controller_temperature', 'street_light_status', 'street_light_brightness'))
+
+
+def serial_timeout (baudrate):
+    """
+    Calculo el timeout del UART para una velocidad de transmisión: 1,5 veces
+    lo que tarda la respuesta más larga (el bloque en vivo, 10 bits por byte).
+
+    Args:
+        baudrate (int): Velocidad de transmisión
+
+    Returns:
+        float: Timeout en segundos
+    """
+    return max(SERIAL_TIMEOUT_MIN, 1.5 * (5 + LIVE_BLOCK_COUNT * 2) * 10 / baudrate)
+
+
+def _merge_spans (items, gap, max_count):
+    """
+    Agrupo tramos de registros en rangos para leerlos con el menor número de
+    peticiones, aceptando leer algunos registros sin usar entre medias.
+
+    Args:
+        items (list): Tramos (inicio, fin) con fin no incluido
+        gap (int): Registros sin usar que acepto leer para unir dos tramos
+        max_count (int): Registros máximos por rango
+
+    Returns:
+        tuple: Rangos (inicio, cantidad) ordenados por dirección
+    """
+    ranges = []
+
+    for start, end in sorted(items):
+        if ranges:
+            last_start, last_end = ranges[-1]
+
+            if start <= last_end + gap and max(end, last_end) - last_start <= max_count:
+                ranges[-1] = (last_start, max(end, last_end))
+                continue
+
+        ranges.append((start, end))
+
+    return tuple((start, end - start) for start, end in ranges)
+
+
+def _lookup (table, code):
+    """
+    Devuelvo la etiqueta de un código en una tabla indexada por código.
+
+    Args:
+        table (tuple): Etiquetas en la posición de su código
+        code (int): Código leído del controlador
+
+    Returns:
+        str: Etiqueta o None si el código no está en la tabla
+    """
+    if code is None or not 0 <= code < len(table):
+        return None
+
+    return table[code]
+
 
 class RenogyRoverLi:
     serial = None
     DEBUG = False
 
     """
-    Tipos de baterías.
+    Tipos de baterías, el índice es el código del controlador (el 0 no existe).
     """
-    BATTERY_TYPE = {
-        1: 'open',
-        2: 'sealed',
-        3: 'gel',
-        4: 'lithium',
-        5: 'self-customized'
-    }
+    BATTERY_TYPE = (None, 'open', 'sealed', 'gel', 'lithium', 'self-customized')
 
     """
-    Estados de carga para la batería.
+    Estados de carga para la batería, el índice es el código del controlador.
     """
-    CHARGING_STATE = {
-        0: 'deactivated',
-        1: 'activated',
-        2: 'mppt',
-        3: 'equalizing',
-        4: 'boost',
-        5: 'floating',
-        6: 'current limiting'
-    }
+    CHARGING_STATE = ('deactivated', 'activated', 'mppt', 'equalizing', 'boost',
+                      'floating', 'current limiting')
+
+    # Último bloque de registros en vivo leído (bytes) y cuándo se leyó (ticks)
+    _live_buf = None
+    _live_ts = 0
+
+    # Pasa a True si el controlador rechaza el bloque completo, desde entonces
+    # lo leo en peticiones de LIVE_SPLIT_COUNT registros
+    _live_split = False
+
+    # Pasa a True con la primera lectura correcta, hasta entonces si la
+    # velocidad configurada no responde vuelvo a FALLBACK_BAUDRATE
+    _baudrate_ok = False
+
+    # Hasta cuándo (ticks) no accedo al UART tras una lectura fallida, así un
+    # fallo no hace que cada getter del ciclo repita sus reintentos. None si no
+    # hay pausa: 0 no sirve, ticks_diff() da la vuelta cada 2^30 ms
+    _cooldown_until = None
+
+    # Rangos (inicio, cantidad) de registros a leer en cada nivel y turno del
+    # siguiente sub-bloque lento, los rangos se calculan a partir de _POLL_TIERS
+    _poll_ranges = None
+    _slow_cursor = 0
 
     # Atributos para almacenar datos estáticos en caché
     _cached_version = None
@@ -78,200 +314,8 @@ class RenogyRoverLi:
     _cached_serial_number = None
     _cached_nominal_battery_capacity = None
 
-    sectionMap = {
-        'model': {
-            'bytes': 8,
-            'address': 0x12,
-            'type': 'string',
-        },
-        'system_voltage_current': {
-            'bytes': 2,
-            'address': 0xa,
-            'type': 'float',
-        },
-        'system_intensity_current': {
-            'bytes': 2,
-            'address': 0xa,
-            'type': 'float',
-        },
-        'hardware': {
-            'bytes': 4,
-            'address': 0x14,
-            'type': 'string',
-        },
-        'version': {
-            'bytes': 4,
-            'address': 0x14,
-            'type': 'string',
-        },
-        'serial_number': {
-            'bytes': 4,
-            'address': 0x18,
-            'type': 'string',
-        },
-        'battery_percentage': {
-            'bytes': 2,
-            'address': 0x100,
-            'type': 'float',
-        },
-        'battery_voltage': {
-            'bytes': 2,
-            'address': 0x101,
-            'type': 'float',
-        },
-        'battery_temperature': {
-            'bytes': 2,
-            'address': 0x103,
-            'type': 'float',
-        },
-        'controller_temperature': {
-            'bytes': 2,
-            'address': 0x103,
-            'type': 'float',
-        },
-        'load_voltage': {
-            'bytes': 2,
-            'address': 0x104,
-            'type': 'float',
-        },
-        'load_current': {
-            'bytes': 2,
-            'address': 0x105,
-            'type': 'float',
-        },
-        'load_power': {
-            'bytes': 2,
-            'address': 0x106,
-            'type': 'float',
-        },
-        'solar_voltage': {
-            'bytes': 2,
-            'address': 0x107,
-            'type': 'float',
-        },
-        'solar_current': {
-            'bytes': 2,
-            'address': 0x108,
-            'type': 'float',
-        },
-        'solar_power': {
-            'bytes': 2,
-            'address': 0x109,
-            'type': 'float',
-        },
-        'today_battery_min_voltage': {
-            'bytes': 2,
-            'address': 0x010B,
-            'type': 'float',
-        },
-        'today_battery_max_voltage': {
-            'bytes': 2,
-            'address': 0x010C,
-            'type': 'float',
-        },
-        'today_max_charging_current': {
-            'bytes': 2,
-            'address': 0x010D,
-            'type': 'float',
-        },
-        'today_max_discharging_current': {
-            'bytes': 2,
-            'address': 0x010E,
-            'type': 'float',
-        },
-        'today_max_charging_power': {
-            'bytes': 2,
-            'address': 0x010D,
-            'type': 'int',
-        },
-        'today_max_discharging_power': {
-            'bytes': 2,
-            'address': 0x010E,
-            'type': 'int',
-        },
-        'today_charging_amp_hours': {
-            'bytes': 2,
-            'address': 0x0111,
-            'type': 'int',
-        },
-        'today_discharging_amp_hours': {
-            'bytes': 2,
-            'address': 0x0112,
-            'type': 'int',
-        },
-        'today_power_generation': {
-            'bytes': 2,
-            'address': 0x0113,
-            'type': 'int',
-        },
-        'today_power_consumption': {
-            'bytes': 2,
-            'address': 0x0114,
-            'type': 'int',
-        },
-        'historical_total_days_operating': {
-            'bytes': 2,
-            'address': 0x0115,
-            'type': 'int',
-        },
-        'historical_total_number_battery_over_discharges': {
-            'bytes': 2,
-            'address': 0x0116,
-            'type': 'int',
-        },
-        'historical_total_number_battery_full_charges': {
-            'bytes': 2,
-            'address': 0x0117,
-            'type': 'int',
-        },
-        'historical_total_charging_amp_hours': {
-            'bytes': 4,
-            'address': 0x0118,
-            'type': 'int',
-        },
-        'historical_total_discharging_amp_hours': {
-            'bytes': 4,
-            'address': 0x011A,
-            'type': 'int',
-        },
-        'historical_cumulative_power_generation': {
-            'bytes': 4,
-            'address': 0x011C,
-            'type': 'int',
-        },
-        'historical_cumulative_power_consumption': {
-            'bytes': 4,
-            'address': 0x011E,
-            'type': 'int',
-        },
-        'street_light_status': {
-            'bytes': 2,
-            'address': 0x0120,
-            'type': 'bool',
-        },
-        'street_light_brightness': {
-            'bytes': 2,
-            'address': 0x0120,
-            'type': 'int',
-        },
-        'charging_status': {
-            'bytes': 2,
-            'address': 0x0120,
-            'type': 'int',
-        },
-        'nominal_battery_capacity': {
-            'bytes': 2,
-            'address': 0xE002,
-            'type': 'int',
-        },
-        'battery_type': {
-            'bytes': 2,
-            'address': 0xE004,
-            'type': 'int',
-        },
-    }
-
-    def __init__ (self, device_id=0, tx_pin=0, rx_pin=1, debug=False):
+    def __init__ (self, device_id=0, tx_pin=0, rx_pin=1, debug=False, preset=None,
+                  baudrate=DEFAULT_BAUDRATE):
         """
         Inicializa el controlador RenogyRoverLi.
         
@@ -280,767 +324,680 @@ class RenogyRoverLi:
             tx_pin (int): Número de pin TX (GPIO) para comunicación UART
             rx_pin (int): Número de pin RX (GPIO) para comunicación UART
             debug (bool): Habilitar salida de depuración
+            preset (dict): Datos estáticos ya conocidos (claves de STATIC_FIELDS),
+                           no se leerán del controlador
+            baudrate (int): Velocidad del UART, si el controlador no responde a
+                            ella vuelvo a FALLBACK_BAUDRATE
         """
         self.device_id = device_id
         self.DEBUG = debug
+
+        # Niveles de sondeo cambiados con set_tier(), el resto usa _POLL_TIERS
+        self._tiers = {}
+
+        # Búfer de recepción compartido por todas las lecturas y copia del
+        # bloque en vivo, los reservo una vez para no fragmentar la memoria
+        self._rxbuf = bytearray(RX_BUFFER_SIZE)
+        self._live_store = bytearray(LIVE_BLOCK_COUNT * 2)
+
+        # Registros fuera del bloque en vivo ya leídos en este ciclo, por
+        # dirección, así los campos que comparten registro hacen una sola lectura
+        self._raw_cache = {}
+
         self.serial = SerialConnection(tx_pin=tx_pin, rx_pin=rx_pin, debug=debug, 
-                                      baudrate=9600, timeout=0.5)
+                                      baudrate=baudrate, timeout=serial_timeout(baudrate),
+                                      timeout_char=2)
 
-        if (debug):
-            print('Modelo RenogyRoverLi instanciado')
-            
-        # Intento inicializar los datos estáticos en caché
-        self._initialize_static_data()
-        
-    def _initialize_static_data(self):
-        """
-        Inicializa los datos estáticos en caché.
-        Este método intenta leer todos los datos estáticos una sola vez durante la inicialización.
-        Si hay algún error, los datos se leerán cuando se soliciten por primera vez.
-        """
-        if self.DEBUG:
-            print('Inicializando datos estáticos en caché')
-            
-        try:
-            # Intento leer la versión del software
-            self._cached_version = self.get_version()
-            if self.DEBUG and self._cached_version:
-                print(f'Versión del software en caché: {self._cached_version}')
-        except Exception as e:
-            if self.DEBUG:
-                print(f'Error al inicializar versión del software: {e}')
-                
-        try:
-            # Intento leer la versión del hardware
-            self._cached_hardware = self.get_hardware()
-            if self.DEBUG and self._cached_hardware:
-                print(f'Versión del hardware en caché: {self._cached_hardware}')
-        except Exception as e:
-            if self.DEBUG:
-                print(f'Error al inicializar versión del hardware: {e}')
-                
-        try:
-            # Intento leer el número de serie
-            self._cached_serial_number = self.get_serial_number()
-            if self.DEBUG and self._cached_serial_number:
-                print(f'Número de serie en caché: {self._cached_serial_number}')
-        except Exception as e:
-            if self.DEBUG:
-                print(f'Error al inicializar número de serie: {e}')
-                
-        try:
-            # Intento leer el voltaje del sistema
-            self._cached_system_voltage_current = self.get_system_voltage_current()
-            if self.DEBUG and self._cached_system_voltage_current:
-                print(f'Voltaje del sistema en caché: {self._cached_system_voltage_current}')
-        except Exception as e:
-            if self.DEBUG:
-                print(f'Error al inicializar voltaje del sistema: {e}')
-                
-        try:
-            # Intento leer el tipo de batería
-            self._cached_battery_type = self.get_battery_type()
-            if self.DEBUG and self._cached_battery_type:
-                print(f'Tipo de batería en caché: {self._cached_battery_type}')
-        except Exception as e:
-            if self.DEBUG:
-                print(f'Error al inicializar tipo de batería: {e}')
-                
-        try:
-            # Intento leer la capacidad nominal de la batería
-            self._cached_nominal_battery_capacity = self.get_nominal_battery_capacity()
-            if self.DEBUG and self._cached_nominal_battery_capacity:
-                print(f'Capacidad nominal de la batería en caché: {self._cached_nominal_battery_capacity}')
-        except Exception as e:
-            if self.DEBUG:
-                print(f'Error al inicializar capacidad nominal de la batería: {e}')
+        # Enlazo la lectura una vez, me ahorro buscar .serial.read_register en cada campo
+        self._read = self.serial.read_register
+        self._send = self.serial.send_prebuilt
 
-    def get_system_voltage_current (self):
-        """
-        Devuelve el voltaje actual de consumo en el sistema
-        0x000A
-        [1] → 8 higher bits: max. voltage supported by the system (V)
-        """
-        # Si ya tenemos el valor en caché, lo devolvemos directamente
-        if self._cached_system_voltage_current is not None:
-            if self.DEBUG:
-                print('Devolviendo voltaje actual de sistema desde caché')
-            return self._cached_system_voltage_current
-            
-        # Si no está en caché, lo leemos del controlador
-        scheme = self.sectionMap['system_voltage_current']
+        # Tramas Modbus ya construidas (con su CRC) por (addr << 8 | n), creo
+        # ahora las del bloque en vivo y los estáticos, el resto al primer uso
+        self._frames = {}
 
-        while True:
-            if self.DEBUG:
-                print('Leyendo voltaje actual de sistema')
+        self._frame(LIVE_BLOCK_START, LIVE_BLOCK_COUNT)
 
-            try:
-                response = self.serial.read_register(scheme['address'],
-                                                     scheme['bytes'],
-                                                     scheme['type'])
-
-                voltage = response[0] >> 8
-                
-                # Guardamos el resultado en caché
-                self._cached_system_voltage_current = voltage
-                return self._cached_system_voltage_current
-            except Exception as e:
-                if self.DEBUG:
-                    print('Error al leer voltaje actual de sistema')
-                    print(e)
+        for start in range(LIVE_BLOCK_START, LIVE_BLOCK_START + LIVE_BLOCK_COUNT, LIVE_SPLIT_COUNT):
+            self._frame(start, min(LIVE_SPLIT_COUNT, LIVE_BLOCK_START + LIVE_BLOCK_COUNT - start))
 
-                sleep(5)
+        for start, count in _merge_spans([(addr, addr + n) for addr, n, _ in STATIC_SECTIONS],
+                                         STATIC_GAP_TOLERANCE, LIVE_BLOCK_COUNT):
+            self._frame(start, count)
 
-        return None
+        # Guardo en caché los datos estáticos conocidos, el resto los leo en
+        # prime_cache() o cuando se pidan por primera vez
+        if preset:
+            for name in STATIC_FIELDS:
+                if preset.get(name) is not None:
+                    setattr(self, '_cached_' + name, preset[name])
 
-    def get_system_intensity_current (self):
+        if _DEBUG and debug:
+            print('Modelo RenogyRoverLi instanciado')
+        
+    def prime_cache (self):
         """
-        Devuelve el consumo en amperios actual de consumo en el sistema
-        0x000A
-        lower bits: rated charging current (A)
+        Leo los datos estáticos que aún no están en caché.
+        No se leen al instanciar para no bloquear el arranque, lo llamo desde
+        el bucle principal. Si falla alguno, se leerá cuando se pida o en la
+        siguiente llamada.
+
+        Returns:
+            bool: True si todos los datos estáticos están en caché
         """
-        scheme = self.sectionMap['system_intensity_current']
+        complete = True
+        pending = [name for name in STATIC_FIELDS if getattr(self, '_cached_' + name) is None]
 
-        while True:
-            try:
-                if self.DEBUG:
-                    print('Leyendo intensidad actual de sistema')
+        if not pending:
+            return True
 
-                response = self.serial.read_register(scheme['address'],
-                                                     scheme['bytes'],
-                                                     scheme['type'])
+        # Leo los registros agrupados en bloques, los getters los toman de la
+        # caché del ciclo en lugar de hacer una petición cada uno
+        for start, count in _merge_spans([(addr, addr + n) for addr, n, _ in STATIC_SECTIONS],
+                                         STATIC_GAP_TOLERANCE, LIVE_BLOCK_COUNT):
+            self._block_read(start, count, STATIC_SECTIONS)
 
-                amps = response[0] & 0x00ff
+        for name in pending:
+            if _DEBUG and self.DEBUG:
+                print(f'Inicializando en caché: {name}')
 
-                return amps
+            try:
+                # Cada getter guarda su valor en caché al leerlo
+                if getattr(self, 'get_' + name)() is None:
+                    complete = False
             except Exception as e:
-                if self.DEBUG:
-                    print('Error al leer intensidad actual de sistema')
-                    print(e)
+                complete = False
 
-                sleep(5)
+                if _DEBUG and self.DEBUG:
+                    print(f'Error al inicializar {name}: {e}')
 
-        return None
+        return complete
 
-    def get_hardware (self):
+    def read_all_live (self):
         """
-        Devuelve la información para la versión del hardware
-        0x0016 y 0x0017 Hardware version 4 bytes
+        Leo en una sola petición todos los registros del bloque 0x0100 - 0x0120
+        (datos en vivo, del día e históricos) y los guardo para los getters.
+        Si el controlador no acepta tantos registros por petición, lo leo en
+        partes de LIVE_SPLIT_COUNT registros.
 
-        :return:
+        Returns:
+            bytearray: Datos en crudo del bloque (2 bytes por registro) o None si falla
         """
-        # Si ya tenemos el valor en caché, lo devolvemos directamente
-        if self._cached_hardware is not None:
-            if self.DEBUG:
-                print('Devolviendo hardware desde caché')
-            return self._cached_hardware
-            
-        # Si no está en caché, lo leemos del controlador
-        if self.DEBUG:
-            print('Leyendo hardware')
+        if _DEBUG and self.DEBUG:
+            print('Leyendo bloque de registros en vivo')
 
-        scheme = self.sectionMap['hardware']
+        if self._cooling_down():
+            self._live_buf = None
+            return None
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        data = None if self._live_split else self._read_raw(LIVE_BLOCK_START, LIVE_BLOCK_COUNT)
 
-        if response:
-            major = response[2] & 0x00ff
-            minor = response[3] >> 8
-            patch = response[3] & 0x00ff
+        if data is None:
+            # Doy una oportunidad a la lectura por partes antes de la pausa
+            self._cooldown_until = None
 
-            # Guardamos el resultado en caché
-            self._cached_hardware = 'V{}.{}.{}'.format(major, minor, patch)
-            return self._cached_hardware
+        if data is not None:
+            # Copio el bloque fuera del búfer de recepción, poll() actualiza solo
+            # partes de él y las siguientes lecturas reutilizan el búfer
+            self._live_store[:] = data
+        elif self._read_live_split():
+            if not self._live_split and _DEBUG and self.DEBUG:
+                print(f'El bloque completo falla, lo leo en partes de {LIVE_SPLIT_COUNT} registros')
 
-        return None
+            self._live_split = True
+        else:
+            self._live_buf = None
+            return None
 
-    def get_version (self):
-        """
-        Devuelve la información sobre la versión del software
-        0x0014 y 0x0015 Software version 4 bytes
-        """
-        # Si ya tenemos el valor en caché, lo devolvemos directamente
-        if self._cached_version is not None:
-            if self.DEBUG:
-                print('Devolviendo versión desde caché')
-            return self._cached_version
-            
-        # Si no está en caché, lo leemos del controlador
-        if self.DEBUG:
-            print('Leyendo versión')
+        self._live_buf = self._live_store
+        self._live_ts = ticks_ms()
 
-        scheme = self.sectionMap['version']
+        return self._live_buf
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+    def _read_live_split (self):
+        """
+        Leo el bloque en vivo en partes de LIVE_SPLIT_COUNT registros.
 
-        if response:
-            major = response[0] & 0x00ff
-            minor = response[1] >> 8
-            patch = response[1] & 0x00ff
+        Returns:
+            bool: True si se leyeron todas las partes
+        """
+        for start in range(LIVE_BLOCK_START, LIVE_BLOCK_START + LIVE_BLOCK_COUNT, LIVE_SPLIT_COUNT):
+            count = min(LIVE_SPLIT_COUNT, LIVE_BLOCK_START + LIVE_BLOCK_COUNT - start)
 
-            # Guardamos el resultado en caché
-            self._cached_version = 'V{}.{}.{}'.format(major, minor, patch)
-            return self._cached_version
+            if not self._read_live_range(start, count):
+                return False
 
-        return None
+        return True
 
-    def get_serial_number (self):
-        """
-        Devuelve el número de serie del controlador
-        0x0018 y 0x0019 Serial number 4 bytes
+    def _block_read (self, start, count, sections):
         """
-        # Si ya tenemos el valor en caché, lo devolvemos directamente
-        if self._cached_serial_number is not None:
-            if self.DEBUG:
-                print('Devolviendo número de serie desde caché')
-            return self._cached_serial_number
-            
-        # Si no está en caché, lo leemos del controlador
-        if self.DEBUG:
-            print('Leyendo número de serie')
-
-        scheme = self.sectionMap['serial_number']
+        Leo un rango de registros en una petición y guardo en la caché del
+        ciclo los datos de cada campo que contiene.
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
-
-        if response:
-            # Guardamos el resultado en caché
-            self._cached_serial_number = '{}{}'.format(response[0], response[1])
-            return self._cached_serial_number
-            
-        return None
+        Args:
+            start (int): Primer registro del rango
+            count (int): Número de registros
+            sections (tuple): Campos (_SEC_*) que repartir desde el rango
 
-    def get_battery_percentage (self):
-        """
-        Devuelve el porcentaje de carga para la batería
-        0x0100 Battery capacity SOC 2 bytes
-        Current battery capacity value 0-100 (%)
-        :return:
+        Returns:
+            bool: True si se leyó correctamente
         """
-        if self.DEBUG:
-            print('Leyendo porcentaje de batería')
+        data = self._read_raw(start, count)
 
-        scheme = self.sectionMap['battery_percentage']
+        if data is None:
+            return False
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        for addr, n, _ in sections:
+            if start <= addr and addr + n <= start + count:
+                offset = (addr - start) * 2
+                self._raw_cache[addr] = bytes(data[offset:offset + n * 2])
 
-        return response[0] if response else None
+        return True
 
-    def get_battery_voltage (self):
+    def _read_raw (self, addr, n):
         """
-        Devuelve el voltaje de la batería
-        0x0101 Battery voltage 2 bytes
-        Battery voltage * 0.1 (V)
-        """
-        if self.DEBUG:
-            print('Leyendo voltaje de batería')
-
-        scheme = self.sectionMap['battery_voltage']
-
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        Leo n registros en el búfer de recepción compartido.
 
-        return float(response[0]) / 10 if response else None
+        Args:
+            addr (int): Primer registro a leer
+            n (int): Número de registros
 
-    def get_battery_temperature (self):
+        Returns:
+            memoryview: Datos en crudo (2 bytes por registro), válidos solo
+                        hasta la siguiente lectura, o None si falla
         """
-        Devuelve la temperatura de la batería en su exterior (sensor externo)
-        0x0103 Battery temperature 2 bytes
-        Actual temperature value (b7: sign bit; b0-b6: temperature value) (ºC)
-        """
-        scheme = self.sectionMap['battery_temperature']
+        if self._cooling_down():
+            return None
 
-        while True:
-            try:
-                if self.DEBUG:
-                    print('Leyendo temperatura de batería')
+        frame = self._frame(addr, n)
+        data = self._send(frame, n, buf=self._rxbuf)
 
-                response = self.serial.read_register(scheme['address'],
-                                                     scheme['bytes'],
-                                                     scheme['type'])
-                battery_temp_bits = response[0] & 0x00ff
-                temp_value = battery_temp_bits & 0x0ff
-                sign = battery_temp_bits >> 7
+        if (not data or len(data) < n * 2) and self._fall_back_baudrate():
+            data = self._send(frame, n, buf=self._rxbuf)
 
-                return -(temp_value - 128) if sign == 1 else temp_value
-            except Exception as e:
-                print(e)
-                print('Error al leer temperatura de batería')
-                sleep(5)
+        if not data or len(data) < n * 2:
+            # Tras el fallo (ya con los reintentos de SerialConnection) dejo
+            # de acceder al UART durante ERROR_COOLDOWN_MS
+            self._cooldown_until = ticks_add(ticks_ms(), ERROR_COOLDOWN_MS)
 
-        return None
+            if _DEBUG and self.DEBUG:
+                print(f'Error al leer el registro {hex(addr)}, pausa de {ERROR_COOLDOWN_MS} ms')
 
-    def get_controller_temperature (self):
-        """
-        Devuelve la temperatura del controlador de carga
-        0x0103 Controller temperature 2 bytes
-        Actual temperature value (b7: sign bit; b0-b6: temperature value) (ºC)
-        """
-        scheme = self.sectionMap['controller_temperature']
+            return None
 
-        if self.DEBUG:
-            print('Leyendo temperatura del controlador solar')
+        self._baudrate_ok = True
 
-        response = self.serial.read_register(scheme['address'],
-                                             scheme['bytes'],
-                                             scheme['type'])
-        controller_temp_bits = response[0] >> 8
-        temp_value = controller_temp_bits & 0x0ff
-        sign = controller_temp_bits >> 7
-
-        return -(temp_value - 128) if sign == 1 else temp_value
+        return data
 
-    def get_load_voltage (self):
+    def _fall_back_baudrate (self):
         """
-        Devuelve el voltaje de la carga actual
-        0x0104 Load voltage 2 bytes
-        Street light voltage * 0.1 (V)
+        Vuelvo a FALLBACK_BAUDRATE si aún no he leído nada a la velocidad
+        configurada, el controlador puede no admitirla. Solo lo hago una vez.
+
+        Returns:
+            bool: True si cambié de velocidad y merece repetir la lectura
         """
-        scheme = self.sectionMap['load_voltage']
+        if self._baudrate_ok or self.serial.baudrate == FALLBACK_BAUDRATE:
+            return False
 
-        if self.DEBUG:
-            print('Leyendo voltaje para la carga actual de consumo')
+        if _DEBUG and self.DEBUG:
+            print(f'Sin respuesta a {self.serial.baudrate} baudios, vuelvo a {FALLBACK_BAUDRATE}')
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        # Las tramas no dependen de la velocidad, solo cambio el UART
+        self._baudrate_ok = True
 
-        return float(response[0]) / 10 if response else None
+        return self.serial.set_baudrate(FALLBACK_BAUDRATE, serial_timeout(FALLBACK_BAUDRATE))
 
-    def get_load_current (self):
-        """
-        Devuelve la intensidad de la carga actual
-        0x0105 Load current 2 bytes
-        Street light current * 0.01 (A)
+    def _frame (self, addr, n):
         """
-        scheme = self.sectionMap['load_current']
-
-        if self.DEBUG:
-            print('Leyendo intensidad para la carga actual de consumo')
+        Devuelvo la trama de lectura para n registros desde addr, la construyo
+        solo la primera vez.
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
-
-        return float(response[0]) / 100 if response else None
+        Args:
+            addr (int): Primer registro a leer
+            n (int): Número de registros
 
-    def get_load_power (self):
+        Returns:
+            bytes: Trama Modbus RTU completa con su CRC
         """
-        Devuelve la potencia de la carga actual
-        0x0105 Load current 2 bytes
-        Street light power (W)
-        """
-        scheme = self.sectionMap['load_power']
-
-        if self.DEBUG:
-            print('Leyendo potencia para la carga actual de consumo')
+        key = addr << 8 | n
+        frame = self._frames.get(key)
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        if frame is None:
+            frame = self._frames[key] = bytes(build_frame(addr, n))
 
-        return response[0] if response else None
+        return frame
 
-    def get_solar_voltage (self):
+    def _cooling_down (self):
         """
-        Devuelve la tensión del panel solar actualmente.
-        0x0107 Solar panel voltage
-        Solar panel voltage * 0.1 (V)
+        Compruebo si estoy en la pausa posterior a una lectura fallida.
+
+        Returns:
+            bool: True si no debo acceder al UART todavía
         """
-        scheme = self.sectionMap['solar_voltage']
+        until = self._cooldown_until
 
-        if self.DEBUG:
-            print('Leyendo voltaje del panel solar actualmente')
+        if until is None:
+            return False
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        if ticks_diff(until, ticks_ms()) > 0:
+            return True
 
-        return float(response[0]) / 10 if response else None
+        # La pausa ha terminado, la desarmo para no comparar ticks caducados
+        self._cooldown_until = None
+        return False
 
-    def get_solar_current (self):
+    def _get_raw (self, addr, n):
         """
-        Devuelve la intensidad del panel solar actualmente.
-        0x0108 Solar panel current (to controller)
-        Solar panel current * 0.01 (A)
-        """
-        scheme = self.sectionMap['solar_current']
-
-        if self.DEBUG:
-            print('Leyendo intensidad del panel solar actualmente')
+        Devuelvo los registros desde la caché del ciclo o los leo y los guardo.
+        Varios campos comparten registro (0x000A, 0x0014) y solo cambia cómo
+        extraigo sus bits.
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
-
-        return float(response[0]) / 100 if response else None
+        Args:
+            addr (int): Primer registro a leer
+            n (int): Número de registros
 
-    def get_solar_power (self):
-        """
-        Devuelve la potencia del panel solar actualmente.
-        0x0109 Solar charging power
-        Solar charging power (W)
+        Returns:
+            bytes: Datos en crudo (2 bytes por registro) o None si falla
         """
-        scheme = self.sectionMap['solar_power']
+        data = self._raw_cache.get(addr)
 
-        if self.DEBUG:
-            print('Leyendo potencia del panel solar actualmente')
+        if data is not None and len(data) >= n * 2:
+            return data
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        data = self._read_raw(addr, n)
 
-        return response[0] if response else None
+        if data is None:
+            return None
 
-    def get_today_battery_min_voltage (self):
-        """
-        Devuelve la tensión mínima de la batería en el día actual
-        0x010B Battery's min. voltage of the current day
-        Battery's min. voltage of the current day * 0.1 (V)
-        """
-        scheme = self.sectionMap['today_battery_min_voltage']
+        # Copio los datos, el búfer de recepción se reutiliza en cada lectura
+        data = bytes(data)
+        self._raw_cache[addr] = data
 
-        if self.DEBUG:
-            print('Leyendo voltaje mínimo en el día para la batería')
+        return data
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+    def _read_live_range (self, start, count):
+        """
+        Leo un rango de registros del bloque en vivo y actualizo esa parte del
+        bloque guardado.
 
-        return float(response[0]) / 10 if response else None
+        Args:
+            start (int): Primer registro del rango
+            count (int): Número de registros
 
-    def get_today_battery_max_voltage (self):
-        """
-        Devuelve la tensión máxima de la batería en el día actual
-        0x010C Battery's max. voltage of the current day
-        Battery's max. voltage of the current day * 0.1 (V)
+        Returns:
+            bool: True si se leyó correctamente
         """
-        scheme = self.sectionMap['today_battery_max_voltage']
+        data = self._read_raw(start, count)
 
-        if self.DEBUG:
-            print('Leyendo voltaje máximo en el día para la batería')
+        if data is None:
+            return False
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        offset = (start - LIVE_BLOCK_START) * 2
+        self._live_store[offset:offset + count * 2] = data
 
-        return float(response[0]) / 10 if response else None
+        return True
 
-    def get_today_max_charging_current (self):
+    def _build_poll_ranges (self):
         """
-        Devuelve la intensidad máxima de carga en el día actual
-        0x010D Battery's max. charging current of the current day
-        Battery's max. charging current of the current day * 0.01 (A)
+        Agrupo en rangos contiguos los registros del bloque en vivo de los
+        niveles 'fast' y 'slow' según _POLL_TIERS y los cambios de set_tier().
+
+        Returns:
+            tuple: (rangos rápidos, sub-bloques lentos), cada uno una tupla de (inicio, cantidad)
         """
-        scheme = self.sectionMap['today_max_charging_current']
+        spans = {'fast': [], 'slow': []}
 
-        if self.DEBUG:
-            print(
-                'Leyendo intensidad máxima de carga en el día para la batería')
+        for name, (address, n, _), tier in _POLL_TIERS:
+            tier = self._tiers.get(name, tier)
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+            if tier in spans:
+                # Los campos de 4 bytes ocupan dos registros
+                spans[tier].append((address, address + (2 if n == 4 else 1)))
 
-        return float(response[0]) / 100 if response else None
+        self._poll_ranges = (_merge_spans(spans['fast'], POLL_GAP_TOLERANCE, LIVE_BLOCK_COUNT),
+                             _merge_spans(spans['slow'], POLL_GAP_TOLERANCE, POLL_SLOW_MAX_COUNT))
+        self._slow_cursor = 0
 
-    def get_today_max_discharging_current (self):
-        """
-        Devuelve la intensidad máxima de descarga en el día actual
-        0x010E Battery's max. discharging current of the current day
-        Battery's max. discharging current of the current day * 0.01 (A)
-        """
-        scheme = self.sectionMap['today_max_discharging_current']
+        if _DEBUG and self.DEBUG:
+            print(f'Rangos de sondeo (rápidos, lentos): {self._poll_ranges}')
 
-        if self.DEBUG:
-            print(
-                'Leyendo intensidad máxima de descarga en el día para la batería')
+        return self._poll_ranges
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
-
-        return float(response[0]) / 100 if response else None
-
-    def get_today_max_charging_power (self):
+    def set_tier (self, name, tier):
         """
-        Devuelve la potencia máxima de carga en el día actual
-        0x010F Battery's max. charging power of the current day
-        Battery's max. charging power of the current day (W)
+        Cambio el nivel de sondeo de un campo del bloque en vivo.
+
+        Args:
+            name (str): Nombre del campo en _POLL_TIERS
+            tier (str): 'fast', 'slow' o 'static'
         """
-        scheme = self.sectionMap['today_max_charging_power']
+        if tier not in TIERS:
+            raise ValueError(f'Nivel de sondeo desconocido: {tier}')
 
-        if self.DEBUG:
-            print('Leyendo potencia máxima de carga en el día para la batería')
+        for field, _, _ in _POLL_TIERS:
+            if field == name:
+                break
+        else:
+            raise ValueError(f'Campo desconocido en el bloque en vivo: {name}')
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        self._tiers[name] = tier
 
-        return response[0] if response else None
+        # Recalculo los rangos en el siguiente sondeo
+        self._poll_ranges = None
 
-    def get_today_max_discharging_power (self):
+    def poll (self):
         """
-        Devuelve la potencia máxima de descarga en el día actual
-        0x0110 Battery's max. discharging power of the current day
-        Battery's max. discharging power of the current day (W)
-        """
-        scheme = self.sectionMap['today_max_discharging_power']
-
-        if self.DEBUG:
-            print(
-                'Leyendo potencia máxima de descarga en el día para la batería')
-
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        Actualizo el bloque en vivo para el ciclo actual.
 
-        return response[0] if response else None
+        La primera vez leo el bloque completo. Después leo en cada llamada los
+        registros del nivel 'fast' y, por turnos, un sub-bloque del nivel
+        'slow'. Los campos 'static' no se vuelven a leer, quedan en caché.
 
-    def get_today_charging_amp_hours (self):
+        Returns:
+            bool: True si se actualizaron los registros rápidos
         """
-        Devuelve la carga en Ah para el día actual
-        0x0111 Charging amp-hrs of the current day (Ah)
-        """
-        scheme = self.sectionMap['today_charging_amp_hours']
-
-        if self.DEBUG:
-            print('Leyendo carga máxima en Ah en el día')
+        # Los registros compartidos se vuelven a leer en cada ciclo
+        self._raw_cache.clear()
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        if self._live_buf is None:
+            return self.read_all_live() is not None
 
-        return response[0] if response else None
+        fast, slow = self._poll_ranges or self._build_poll_ranges()
+        ok = True
 
-    def get_today_discharging_amp_hours (self):
-        """
-        Devuelve la descarga en Ah para el día actual
-        0x0112 Discharging amp-hrs of the current day (Ah)
-        """
-        scheme = self.sectionMap['today_discharging_amp_hours']
+        for start, count in fast:
+            if not self._read_live_range(start, count):
+                ok = False
 
-        if self.DEBUG:
-            print('Leyendo descarga máxima en Ah en el día')
+        if slow:
+            cursor = self._slow_cursor % len(slow)
+            start, count = slow[cursor]
+            self._read_live_range(start, count)
+            self._slow_cursor = cursor + 1
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        if ok:
+            self._live_ts = ticks_ms()
 
-        return response[0] if response else None
+        return ok
 
-    def get_today_power_generation (self):
+    def invalidate_cache (self):
         """
-        Devuelve la potencia de generada en el día actual
-        0x0113 Power generation of the current day (kilowatt hour / 10000)
+        Descarto el bloque en vivo y los registros leídos en este ciclo, la
+        siguiente lectura vuelve a pedirlos al controlador sin esperar a que
+        caduquen. Los datos estáticos se mantienen en caché.
         """
-        scheme = self.sectionMap['today_power_generation']
-
-        if self.DEBUG:
-            print('Leyendo potencia de generación en el día')
+        self._live_buf = None
+        self._live_ts = 0
+        self._raw_cache.clear()
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+    def _read_live (self, address, index=0):
+        """
+        Obtengo un registro del bloque en vivo, leyendo el bloque completo si
+        no lo tengo o ha caducado.
 
-        return response[0] if response else None
+        Args:
+            address (int): Dirección del registro, la primera de su _SEC_*
+            index (int): Registro dentro del campo (1 para la parte baja de los de 4 bytes)
 
-    def get_today_power_consumption (self):
+        Returns:
+            int: Valor de 16 bits del registro o None si no se pudo leer
         """
-        Devuelve la potencia consumida en el día actual
-        0x0114 Power consumption of the current day (kilowatt hour / 10000)
-        """
-        scheme = self.sectionMap['today_power_consumption']
+        buf = self._live_buf
 
-        if self.DEBUG:
-            print('Leyendo potencia de consumición en el día')
+        if buf is None or ticks_diff(ticks_ms(), self._live_ts) > LIVE_CACHE_TTL_MS:
+            buf = self.read_all_live()
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+            if buf is None:
+                return None
 
-        return response[0] if response else None
+        return struct.unpack_from('>H', buf, (address - LIVE_BLOCK_START + index) * 2)[0]
 
-    def get_historical_total_days_operating (self):
+    def get_system_voltage_current (self):
         """
-        Devuelve el número de días que el controlador ha estado operativo.
-        0x0115 Total number of operating days - 2 bytes
+        Devuelve el voltaje actual de consumo en el sistema
+        0x000A
+        [1] → 8 higher bits: max. voltage supported by the system (V)
         """
-        scheme = self.sectionMap['historical_total_days_operating']
+        # Si ya tenemos el valor en caché, lo devolvemos directamente
+        if self._cached_system_voltage_current is not None:
+            if _DEBUG and self.DEBUG:
+                print('Devolviendo voltaje actual de sistema desde caché')
+            return self._cached_system_voltage_current
+            
+        # Si no está en caché, lo leemos del controlador
+        if _DEBUG and self.DEBUG:
+            print('Leyendo voltaje actual de sistema')
 
-        if self.DEBUG:
-            print('Leyendo número de días operativo el controlador solar')
+        addr, n, _ = _SEC_SYSTEM_VOLTAGE_CURRENT
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        response = self._get_raw(addr, n)
 
-        return response[0] if response else None
+        if response is None:
+            return None
 
-    def get_historical_total_number_battery_over_discharges (self):
+        # Guardamos el resultado en caché
+        self._cached_system_voltage_current = response[0]
+
+        return self._cached_system_voltage_current
+
+    def get_system_intensity_current (self):
         """
-        Devuelve el número de sobre descargas de la batería.
-        0x0116 Total number of battery over-discharges - 2 bytes
+        Devuelve el consumo en amperios actual de consumo en el sistema
+        0x000A
+        lower bits: rated charging current (A)
         """
-        scheme = self.sectionMap[
-            'historical_total_number_battery_over_discharges']
+        if _DEBUG and self.DEBUG:
+            print('Leyendo intensidad actual de sistema')
 
-        if self.DEBUG:
-            print('Leyendo número de descargas de la batería')
+        addr, n, _ = _SEC_SYSTEM_INTENSITY_CURRENT
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        response = self._get_raw(addr, n)
 
-        return response[0] if response else None
+        return response[1] if response is not None else None
 
-    def get_historical_total_number_battery_full_charges (self):
+    def get_hardware (self):
         """
-        Devuelve el número de cargas completas de la batería.
-        0x0117 Total number of battery full-charges - 2 bytes
+        Devuelve la información para la versión del hardware
+        0x0016 y 0x0017 Hardware version 4 bytes
+
+        :return:
         """
-        scheme = self.sectionMap['historical_total_number_battery_full_charges']
+        # Si ya tenemos el valor en caché, lo devolvemos directamente
+        if self._cached_hardware is not None:
+            if _DEBUG and self.DEBUG:
+                print('Devolviendo hardware desde caché')
+            return self._cached_hardware
+            
+        # Si no está en caché, lo leemos del controlador
+        if _DEBUG and self.DEBUG:
+            print('Leyendo hardware')
+
+        addr, n, _ = _SEC_HARDWARE
 
-        if self.DEBUG:
-            print('Leyendo número de cargas completas de la batería')
+        response = self._get_raw(addr, n)
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        if response is not None:
+            # Bytes 5, 6 y 7 del bloque 0x0014 - 0x0017
+            major, minor, patch = response[5], response[6], response[7]
 
-        return response[0] if response else None
+            # Guardamos el resultado en caché
+            self._cached_hardware = 'V%d.%d.%d' % (major, minor, patch)
+            return self._cached_hardware
 
-    def get_historical_total_charging_amp_hours (self):
+        return None
+
+    def get_version (self):
         """
-        Devuelve la carga total en Ah que ha sido almacenado en la batería.
-        0x0118-0x0119 Total charging amp-hrs of the battery - 4 bytes (Ah)
+        Devuelve la información sobre la versión del software
+        0x0014 y 0x0015 Software version 4 bytes
         """
-        scheme = self.sectionMap['historical_total_charging_amp_hours']
+        # Si ya tenemos el valor en caché, lo devolvemos directamente
+        if self._cached_version is not None:
+            if _DEBUG and self.DEBUG:
+                print('Devolviendo versión desde caché')
+            return self._cached_version
+            
+        # Si no está en caché, lo leemos del controlador
+        if _DEBUG and self.DEBUG:
+            print('Leyendo versión')
 
-        if self.DEBUG:
-            print('Leyendo carga total en Ah')
+        addr, n, _ = _SEC_VERSION
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        response = self._get_raw(addr, n)
 
-        # print('historical_total_charging_amp_hours', response)
+        if response is not None:
+            # Bytes 1, 2 y 3 del bloque 0x0014 - 0x0017
+            major, minor, patch = response[1], response[2], response[3]
 
-        return response[1] if response else None
+            # Guardamos el resultado en caché
+            self._cached_version = 'V%d.%d.%d' % (major, minor, patch)
+            return self._cached_version
 
-    def get_historical_total_discharging_amp_hours (self):
+        return None
+
+    def get_serial_number (self):
         """
-        Devuelve la descarga total en Ah que ha sido descargado en la batería.
-        0x011A-0x011B Total discharging amp-hrs of the battery - 4 bytes (Ah)
+        Devuelve el número de serie del controlador
+        0x0018 y 0x0019 Serial number 4 bytes
         """
-        scheme = self.sectionMap['historical_total_discharging_amp_hours']
-
-        if self.DEBUG:
-            print('Leyendo descarga total en Ah')
+        # Si ya tenemos el valor en caché, lo devolvemos directamente
+        if self._cached_serial_number is not None:
+            if _DEBUG and self.DEBUG:
+                print('Devolviendo número de serie desde caché')
+            return self._cached_serial_number
+            
+        # Si no está en caché, lo leemos del controlador
+        if _DEBUG and self.DEBUG:
+            print('Leyendo número de serie')
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        addr, n, _ = _SEC_SERIAL_NUMBER
 
-        # print('historical_total_discharging_amp_hours', response)
+        response = self._get_raw(addr, n)
 
-        return response[1] if response else None
+        if response is not None:
+            # Guardamos el resultado en caché
+            self._cached_serial_number = '{}{}'.format(*struct.unpack_from('>HH', response, 0))
+            return self._cached_serial_number
+            
+        return None
 
-    def get_historical_cumulative_power_generation (self):
+    def get_battery_temperature (self):
         """
-        Devuelve la potencia generada acumulada en el tiempo.
-        0x011C-0x011D Cumulative power generation - 4 bytes (kilowatt hour/ 10000)
+        Devuelve la temperatura de la batería en su exterior (sensor externo)
+        0x0103 Battery temperature 2 bytes
+        Actual temperature value (b7: sign bit; b0-b6: temperature value) (ºC)
         """
-        scheme = self.sectionMap['historical_cumulative_power_generation']
+        value = self._read_live(_SEC_BATTERY_TEMPERATURE[0])
 
-        if self.DEBUG:
-            print('Devuelve la potencia generada acumulada en el tiempo.')
+        if value is None:
+            return None
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        battery_temp_bits = value & 0x00ff
+        temp_value = battery_temp_bits & 0x0ff
+        sign = battery_temp_bits >> 7
 
-        return response[1] if response else None
+        return -(temp_value - 128) if sign == 1 else temp_value
 
-    def get_historical_cumulative_power_consumption (self):
+    def get_controller_temperature (self):
         """
-        Devuelve la potencia consumida acumulada en el tiempo.
-        0x011E-0x011F Cumulative power consumption - 4 bytes (kilowatt hour/ 10000)
+        Devuelve la temperatura del controlador de carga
+        0x0103 Controller temperature 2 bytes
+        Actual temperature value (b7: sign bit; b0-b6: temperature value) (ºC)
         """
-        scheme = self.sectionMap['historical_cumulative_power_consumption']
+        if _DEBUG and self.DEBUG:
+            print('Leyendo temperatura del controlador solar')
 
-        if self.DEBUG:
-            print('Devuelve la potencia consumida acumulada en el tiempo.')
+        value = self._read_live(_SEC_CONTROLLER_TEMPERATURE[0])
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        if value is None:
+            return None
 
-        return response[1] if response else None
+        controller_temp_bits = value >> 8
+        temp_value = controller_temp_bits & 0x0ff
+        sign = controller_temp_bits >> 7
+
+        return -(temp_value - 128) if sign == 1 else temp_value
 
     def get_street_light_status (self):
         """
         Devuelve el estado de la luz de calle.
         0x0120 Street light status - 2 byte (bool)
         """
-        # scheme = self.sectionMap['street_light_status']
+        # addr, n, _ = _SEC_STREET_LIGHT_STATUS
 
-        if self.DEBUG:
+        if _DEBUG and self.DEBUG:
             print('Leyendo estado de la luz en la calle')
 
         # Como me daba problemas obtener este dato, lo saco del voltaje solar.
-        return bool(
-            self.get_street_light_brightness() > 12.3) if self.get_street_light_brightness() else False
+        brightness = self.get_street_light_brightness()
+
+        return bool(brightness and brightness > 12.3)
 
     def get_street_light_brightness (self):
         """
         Devuelve el brillo de la luz de calle.
         0x0120 Street light brightness - 2 byte (0-6, 0-100%)
         """
-        # scheme = self.sectionMap['street_light_brightness']
+        # addr, n, _ = _SEC_STREET_LIGHT_BRIGHTNESS
 
-        if self.DEBUG:
+        if _DEBUG and self.DEBUG:
             print('Leyendo brillo de la luz en la calle')
 
         """
         Esto es una prueba, no conseguía obtener la luz real
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        response = self._read(addr, n)
 
         print('street_light_brightness response:', response)
-        print('street_light_brightness response hexadecimal:', hex(response[0]))
-        print('street_light_brightness 0x00FF:', response[0] & 0x00FF)
-        print('street_light_brightness b:', bin(response[0]))
+        print('street_light_brightness response hexadecimal:', hex(response[1]))
+        print('street_light_brightness 0x00FF:', response[1])
+        print('street_light_brightness b:', bin(response[1]))
 
-        return response[0] if response else None
+        return response[1] if response else None
         """
 
         # Obtengo el valor en proporción a la luz de calle
-        voltage = self.get_solar_voltage()
+        # Uso el valor en decivoltios, los límites están en la misma escala
+        voltage = self.get_solar_voltage_raw()
 
-        min_light_voltage = 12.3
-        max_light_voltage = 41.5
+        if voltage is None:
+            return None
 
         ## OJO → Cálculo preparado para dos placas en serie 24v (hasta 40v aprox)
-        if voltage >= max_light_voltage:
+        if voltage >= _LIGHT_MAX_VOLTAGE:
             porcent = 100
-        elif voltage < min_light_voltage:
+        elif voltage < _LIGHT_MIN_VOLTAGE:
             porcent = 0
         else:
-            porcent = (100 / (max_light_voltage - min_light_voltage)) * (
-                        voltage - min_light_voltage)
+            porcent = 100 * (voltage - _LIGHT_MIN_VOLTAGE) // _LIGHT_VOLTAGE_RANGE
 
-        return int(porcent)
+        return porcent
 
     def get_charging_status (self):
         """
         Devuelve el estado de carga para la batería.
         0x0120 Charging status - 2 byte (0x00-0x06)
         """
-        scheme = self.sectionMap['charging_status']
-
-        if self.DEBUG:
+        if _DEBUG and self.DEBUG:
             print('Leyendo estado de carga para la batería')
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        value = self._read_live(_SEC_CHARGING_STATUS[0])
 
-        return response[0] & 0x00ff if response else None
+        return value & 0x00ff if value is not None else None
 
     def get_charging_status_label (self):
         """
         Devuelve el estado de la batería.
         0x0120 Charging status - 2 byte (string from self.CHARGING_STATE)
         """
-        if self.DEBUG:
+        if _DEBUG and self.DEBUG:
             print('Leyendo estado de carga (string) para la batería')
 
         charging_status = self.get_charging_status()
 
-        return self.CHARGING_STATE.get(
-            self.get_charging_status()) if charging_status else self.CHARGING_STATE.get(
-            0)
+        # Sin lectura lo doy por desactivado, igual que el estado 0
+        return _lookup(self.CHARGING_STATE,
+                       charging_status if charging_status is not None else 0)
 
     def get_nominal_battery_capacity (self):
         """
@@ -1049,22 +1006,21 @@ class RenogyRoverLi:
         """
         # Si ya tenemos el valor en caché, lo devolvemos directamente
         if self._cached_nominal_battery_capacity is not None:
-            if self.DEBUG:
+            if _DEBUG and self.DEBUG:
                 print('Devolviendo capacidad nominal de la batería desde caché')
             return self._cached_nominal_battery_capacity
             
         # Si no está en caché, lo leemos del controlador
-        scheme = self.sectionMap['nominal_battery_capacity']
+        addr, n, _ = _SEC_NOMINAL_BATTERY_CAPACITY
 
-        if self.DEBUG:
+        if _DEBUG and self.DEBUG:
             print('Leyendo capacidad nominal de la batería')
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        response = self._get_raw(addr, n)
 
-        if response:
+        if response is not None:
             # Guardamos el resultado en caché
-            self._cached_nominal_battery_capacity = response[0]
+            self._cached_nominal_battery_capacity = struct.unpack_from('>H', response, 0)[0]
             return self._cached_nominal_battery_capacity
             
         return None
@@ -1076,133 +1032,101 @@ class RenogyRoverLi:
         """
         # Si ya tenemos el valor en caché, lo devolvemos directamente
         if self._cached_battery_type is not None:
-            if self.DEBUG:
+            if _DEBUG and self.DEBUG:
                 print('Devolviendo tipo de batería desde caché')
             return self._cached_battery_type
             
         # Si no está en caché, lo leemos del controlador
-        scheme = self.sectionMap['battery_type']
+        addr, n, _ = _SEC_BATTERY_TYPE
 
-        if self.DEBUG:
+        if _DEBUG and self.DEBUG:
             print('Leyendo tipo de batería')
 
-        response = self.serial.read_register(scheme['address'], scheme['bytes'],
-                                             scheme['type'])
+        response = self._get_raw(addr, n)
 
-        if response:
+        if response is not None:
             # Guardamos el resultado en caché
-            self._cached_battery_type = self.BATTERY_TYPE.get(response[0])
+            self._cached_battery_type = _lookup(self.BATTERY_TYPE, struct.unpack_from('>H', response, 0)[0])
             return self._cached_battery_type
             
         return None
 
+    def get_device_id (self):
+        """
+        Devuelve el identificador del dispositivo.
+        """
+        return self.device_id
+
+    def _collect (self, fields, result=None):
+        """
+        Llamo al getter de cada campo y devuelvo sus valores, los getters de
+        los escalados ya los devuelven convertidos a su unidad.
+
+        Args:
+            fields (tuple): Nombres de los campos, en el orden a devolver
+            result (dict, opcional): Diccionario a rellenar, si no lo creo
+
+        Returns:
+            dict: Valor de cada campo por su nombre
+        """
+        if result is None:
+            result = {}
+
+        for name in fields:
+            result[name] = getattr(self, 'get_' + name)()
+
+        return result
+
     def get_today_historical_info_datas (self):
         """
         Devuelve una lista con los datos históricos para el día actual
         :return:
         """
-        return {
-            'today_battery_max_voltage': self.get_today_battery_max_voltage(),
-            'today_battery_min_voltage': self.get_today_battery_min_voltage(),
-            'today_max_charging_current': self.get_today_max_charging_current(),
-            'today_max_discharging_current': self.get_today_max_discharging_current(),
-            'today_max_charging_power': self.get_today_max_charging_power(),
-            'today_charging_amp_hours': self.get_today_charging_amp_hours(),
-            'today_discharging_amp_hours': self.get_today_discharging_amp_hours(),
-            'today_power_generation': self.get_today_power_generation(),
-            'today_power_consumption': self.get_today_power_consumption(),
-
-        }
+        return self._collect(TODAY_HISTORICAL_FIELDS)
 
     def get_historical_info_datas (self):
         """
         Devuelve una lista con los datos históricos generales
         :return:
         """
-        return {
-            'historical_total_days_operating': self.get_historical_total_days_operating(),
-            'historical_total_number_battery_over_discharges': self.get_historical_total_number_battery_over_discharges(),
-            'historical_total_number_battery_full_charges': self.get_historical_total_number_battery_full_charges(),
-            'historical_total_charging_amp_hours': self.get_historical_total_charging_amp_hours(),
-            'historical_total_discharging_amp_hours': self.get_historical_total_discharging_amp_hours(),
-            'historical_cumulative_power_generation': self.get_historical_cumulative_power_generation(),
-            'historical_cumulative_power_consumption': self.get_historical_cumulative_power_consumption(),
-        }
+        return self._collect(HISTORICAL_FIELDS)
 
     def get_all_controller_info_datas (self):
         """
         Devuelve información del controlador de carga solar.
         :return:
         """
-        return {
-            'device_id': self.device_id,
-            'hardware': self.get_hardware(),
-            'version': self.get_version(),
-            'serial_number': self.get_serial_number(),
-            'system_voltage_current': self.get_system_voltage_current(),
-            'system_intensity_current': self.get_system_intensity_current(),
-            'battery_type': self.get_battery_type(),
-            'nominal_battery_capacity': self.get_nominal_battery_capacity(),
-        }
+        return self._collect(CONTROLLER_FIELDS)
 
     def get_all_solar_panel_info_datas (self):
         """
         Devuelve toda la información de los paneles solares.
         :return:
         """
-        return {
-            'solar_current': self.get_solar_current(),
-            'solar_voltage': self.get_solar_voltage(),
-            'solar_power': self.get_solar_power(),
-        }
+        return self._collect(SOLAR_PANEL_FIELDS)
 
     def get_all_battery_info_datas (self):
         """
         Devuelve toda la información de la batería.
         :return:
         """
-        return {
-            'battery_voltage': self.get_battery_voltage(),
-            'battery_temperature': self.get_battery_temperature(),
-            'battery_percentage': self.get_battery_percentage(),
-            'charging_status': self.get_charging_status(),
-            'charging_status_label': self.get_charging_status_label(),
-        }
+        return self._collect(BATTERY_FIELDS)
 
     def get_all_load_info_datas (self):
         """
         Devuelve toda la información de carga.
         :return:
         """
-        return {
-            'load_voltage': self.get_load_voltage(),
-            'load_current': self.get_load_current(),
-            'load_power': self.get_load_power(),
-        }
+        return self._collect(LOAD_FIELDS)
 
-    def get_all_datas (self):
+    def get_all_datas (self, result=None):
         """
         Devuelve todos los datos del controlador de carga solar
+        :param result: Diccionario a rellenar, así se reutiliza en cada ciclo
         :return:
         """
-        # Usando dict.update() en lugar de ** unpacking para compatibilidad con MicroPython
-        result = {}
-        result.update(self.get_today_historical_info_datas())
-        result.update(self.get_historical_info_datas())
-        result.update(self.get_all_controller_info_datas())
-        result.update(self.get_all_solar_panel_info_datas())
-        result.update(self.get_all_battery_info_datas())
-        result.update(self.get_all_load_info_datas())
-        
-        # Add additional fields
-        additional_fields = {
-            'controller_temperature': self.get_controller_temperature(),
-            'street_light_status': self.get_street_light_status(),
-            'street_light_brightness': self.get_street_light_brightness(),
-        }
-        result.update(additional_fields)
-        
-        return result
+        # Un solo diccionario en una pasada, sin unir los de cada grupo
+        return self._collect(ALL_FIELDS, result)
 
     def debug (self):
         """
@@ -1215,7 +1139,18 @@ class RenogyRoverLi:
         - Estado de la batería
         - Estado de los paneles solares
         - Información histórica
+
+        Solo muestra algo con la depuración activada. Los datos se leen una
+        sola vez al empezar, así todo lo mostrado es del mismo instante.
         """
+        if not (_DEBUG and self.DEBUG):
+            return
+
+        try:
+            datas = self.get_all_datas()
+        except Exception as e:
+            datas = {}
+            print(f"Error al leer los datos del controlador: {e}")
 
         print("\n" + "="*50)
         print("DEPURACIÓN DEL CONTROLADOR RENOGY ROVER LI")
@@ -1241,73 +1176,79 @@ class RenogyRoverLi:
         # Mostrar lecturas actuales
         print("\n--- LECTURAS ACTUALES ---")
         print("Estado de la batería:")
-        try:
-            battery_voltage = self.get_battery_voltage()
-            print(f"  Voltaje de la batería: {battery_voltage}V")
-        except Exception as e:
-            print(f"  Error al leer voltaje de la batería: {e}")
-            
-        try:
-            battery_percentage = self.get_battery_percentage()
-            print(f"  Porcentaje de la batería: {battery_percentage}%")
-        except Exception as e:
-            print(f"  Error al leer porcentaje de la batería: {e}")
-            
-        try:
-            battery_temperature = self.get_battery_temperature()
-            print(f"  Temperatura de la batería: {battery_temperature}°C")
-        except Exception as e:
-            print(f"  Error al leer temperatura de la batería: {e}")
-            
-        try:
-            charging_status = self.get_charging_status_label()
-            print(f"  Estado de carga: {charging_status}")
-        except Exception as e:
-            print(f"  Error al leer estado de carga: {e}")
+        print(f"  Voltaje de la batería: {datas.get('battery_voltage')}V")
+        print(f"  Porcentaje de la batería: {datas.get('battery_percentage')}%")
+        print(f"  Temperatura de la batería: {datas.get('battery_temperature')}°C")
+        print(f"  Estado de carga: {datas.get('charging_status_label')}")
         
         print("\nEstado de los paneles solares:")
-        try:
-            solar_voltage = self.get_solar_voltage()
-            print(f"  Voltaje de los paneles: {solar_voltage}V")
-        except Exception as e:
-            print(f"  Error al leer voltaje de los paneles: {e}")
-            
-        try:
-            solar_current = self.get_solar_current()
-            print(f"  Corriente de los paneles: {solar_current}A")
-        except Exception as e:
-            print(f"  Error al leer corriente de los paneles: {e}")
-            
-        try:
-            solar_power = self.get_solar_power()
-            print(f"  Potencia de los paneles: {solar_power}W")
-        except Exception as e:
-            print(f"  Error al leer potencia de los paneles: {e}")
+        print(f"  Voltaje de los paneles: {datas.get('solar_voltage')}V")
+        print(f"  Corriente de los paneles: {datas.get('solar_current')}A")
+        print(f"  Potencia de los paneles: {datas.get('solar_power')}W")
         
         print("\nEstado del controlador:")
-        try:
-            controller_temperature = self.get_controller_temperature()
-            print(f"  Temperatura del controlador: {controller_temperature}°C")
-        except Exception as e:
-            print(f"  Error al leer temperatura del controlador: {e}")
+        print(f"  Temperatura del controlador: {datas.get('controller_temperature')}°C")
         
         # Mostrar información histórica
         print("\n--- INFORMACIÓN HISTÓRICA DEL DÍA ---")
-        try:
-            today_data = self.get_today_historical_info_datas()
-            for key, value in today_data.items():
-                print(f"  {key}: {value}")
-        except Exception as e:
-            print(f"  Error al leer información histórica del día: {e}")
+        for key in TODAY_HISTORICAL_FIELDS:
+            print(f"  {key}: {datas.get(key)}")
             
         print("\n--- INFORMACIÓN HISTÓRICA TOTAL ---")
-        try:
-            historical_data = self.get_historical_info_datas()
-            for key, value in historical_data.items():
-                print(f"  {key}: {value}")
-        except Exception as e:
-            print(f"  Error al leer información histórica total: {e}")
+        for key in HISTORICAL_FIELDS:
+            print(f"  {key}: {datas.get(key)}")
         
         print("\n" + "="*50)
         print("FIN DE LA DEPURACIÓN")
-        print("="*50 + "\n")
\ No newline at end of file
+        print("="*50 + "\n")
+
+
+def _make_live_getter (name, address, index, scale=None):
+    """
+    Creo el getter de un campo del bloque en vivo.
+
+    Args:
+        name (str): Nombre del campo
+        address (int): Dirección del registro
+        index (int): Registro dentro del campo, 1 para la parte baja de los de 4 bytes
+        scale (int, opcional): Divisor del campo (ver SCALE), con él el getter
+                               devuelve el valor en su unidad como float
+
+    Returns:
+        function: Método get_<name> (o get_<name>_raw sin scale) para RenogyRoverLi
+    """
+    if scale is None:
+        def getter (self):
+            if _DEBUG and self.DEBUG:
+                print('Leyendo ' + name)
+
+            return self._read_live(address, index)
+    else:
+        def getter (self):
+            if _DEBUG and self.DEBUG:
+                print('Leyendo ' + name)
+
+            raw = self._read_live(address, index)
+
+            return None if raw is None else raw / scale
+
+    return getter
+
+
+# Genero los getters de los campos del bloque en vivo que la clase no define
+# con su propia decodificación (temperaturas, estado de carga, luz de calle).
+# Los escalados devuelven float en su unidad (V, A) y tienen además
+# get_<campo>_raw con el entero sin convertir (decivoltios, centiamperios)
+for _name, (_address, _count, _type), _tier in _POLL_TIERS:
+    if not hasattr(RenogyRoverLi, 'get_' + _name):
+        _index = 1 if _count == 4 else 0
+        _scale = SCALE.get(_name)
+
+        setattr(RenogyRoverLi, 'get_' + _name,
+                _make_live_getter(_name, _address, _index, _scale))
+
+        if _scale is not None:
+            setattr(RenogyRoverLi, 'get_' + _name + '_raw',
+                    _make_live_getter(_name, _address, _index))
+
+del _name, _address, _count, _type, _tier, _index, _scale
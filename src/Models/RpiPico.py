@@ -1,6 +1,6 @@
-from machine import ADC, Pin, SPI, I2C, deepsleep
+from machine import ADC, Pin, SPI, I2C, Timer, deepsleep
 import network
-from time import sleep_ms
+from time import sleep_ms, ticks_ms, ticks_diff
 
 # Constants
 WIFI_DISCONNECTED = 0
@@ -58,6 +58,10 @@ class RpiPico:
 
     # Almaceno batería externa si la configuramos
     external_battery = None
+
+    # Último estado resumido y el momento (ticks) en el que se leyó.
+    _status_cache = None
+    _status_ts = 0
     
     # LEDs externos
     led_power = None
@@ -94,6 +98,12 @@ class RpiPico:
 
         # Defino Pin para el LED integrado
         self.LED_INTEGRATED = Pin("LED", Pin.OUT)
+
+        # Temporizador para parpadear el LED integrado sin bloquear, enlazo
+        # el callback una vez para no reservar memoria en cada interrupción
+        self._blink_timer = Timer()
+        self._blink_left = 0
+        self._blink_cb = self._blink_step
         
         # Inicializo los LEDs externos si se proporcionan los pines
         if led_power_pin is not None:
@@ -360,6 +370,39 @@ class RpiPico:
         """
         self.LED_INTEGRATED.off()
         
+    def led_blink (self, count, period_ms=200) -> None:
+        """
+        Parpadea el LED integrado sin bloquear: lo apaga ya y lo enciende
+        count veces, cambiando de estado cada period_ms con un temporizador.
+        Termina apagado.
+
+        :param count: Veces que se enciende el LED
+        :param period_ms: Tiempo en ms de cada estado encendido o apagado
+        :return: None
+        """
+        self._blink_timer.deinit()
+        self.LED_INTEGRATED.off()
+        self._blink_left = count * 2
+
+        self._blink_timer.init(period=period_ms, mode=Timer.PERIODIC,
+                               callback=self._blink_cb)
+
+    def _blink_step (self, timer) -> None:
+        """
+        Callback del temporizador de led_blink(), cambia el estado del LED
+        integrado y para el temporizador al terminar el parpadeo.
+
+        :param timer: Temporizador que llama al callback
+        :return: None
+        """
+        self._blink_left -= 1
+
+        if self._blink_left > 0:
+            self.LED_INTEGRATED.toggle()
+        else:
+            timer.deinit()
+            self.LED_INTEGRATED.off()
+
     def led_power_on(self) -> None:
         """
         Enciende el LED de encendido externo.
@@ -665,6 +708,48 @@ class RpiPico:
 
         self.read_external_battery()
 
+    def get_status(self, max_age_ms=5000) -> dict:
+        """
+        Obtiene un resumen del estado del microcontrolador (temperatura, wifi y
+        batería externa si existe).
+
+        Si ya se leyó hace menos de max_age_ms devuelve la misma lectura, así
+        todos los envíos de un ciclo comparten una sola lectura del ADC y del
+        driver wifi.
+
+        Args:
+            max_age_ms (int): Antigüedad máxima en milisegundos de la lectura reutilizada.
+
+        Returns:
+            dict: Estado del microcontrolador.
+        """
+        now = ticks_ms()
+
+        if self._status_cache is not None and ticks_diff(now, self._status_ts) < max_age_ms:
+            return self._status_cache
+
+        # Consulto la conexión WiFi una sola vez
+        wifi_connected = self.wifi_is_connected()
+
+        status = {
+            "temperature": self.get_cpu_temperature(),
+            "wifi_connected": wifi_connected,
+            "wifi_signal_strength": self.get_wireless_rssi() if wifi_connected else None,
+        }
+
+        # Añado información de la batería si está disponible
+        battery = self.external_battery
+
+        if battery:
+            self.read_external_battery()
+            status["battery_percentage"] = battery["voltage_percentage"]
+            status["battery_voltage"] = battery["voltage_current"]
+
+        self._status_cache = status
+        self._status_ts = now
+
+        return status
+
     def deepsleep(self, seconds):
         """
         Entra en modo sueño profundo durante los segundos recibidos.
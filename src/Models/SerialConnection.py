@@ -58,16 +58,109 @@
 #######################################
 from machine import UART, Pin
 import time
+import micropython
+from micropython import const
+
+# Mensajes de depuración, al compilar con "make mpy" lo fijo a False y se
+# omite todo el código de depuración (make mpy DEBUG=1 para conservarlo)
+_DEBUG = const(True)
 
 # Configuraciones predeterminadas
 DEFAULT_RETRIES = 5  # Número de reintentos
 DEFAULT_TIMEOUT = 3  # Tiempo de espera en segundos
 DEFAULT_BAUDRATE = 9600  # Velocidad de transmisión
+DEFAULT_TIMEOUT_CHAR = 2  # Espera máxima entre bytes en ms, un hueco mayor es fin de trama en RTU
+SLAVE_ID = 1  # ID de esclavo predeterminado para Renogy Rover Li
+READ_FUNCTION_CODE = 3  # Código para leer registros
+RESPONSE_MARGIN_MS = 50  # Margen sobre el tiempo de transmisión de la respuesta
+RETRY_BACKOFF_MS = 20  # Pausa tras el primer error del UART, se duplica en cada reintento
+MAX_READ_COUNT = 125  # Registros máximos por petición de la función 3
+MAX_RESPONSE_SIZE = 5 + MAX_READ_COUNT * 2  # Respuesta más larga de la función 3
+
+
+def _build_crc_table():
+    """
+    Precalculo la tabla del CRC-16 de Modbus (polinomio 0xA001) para los 256
+    valores posibles de un byte.
+
+    Returns:
+        bytes: 512 bytes, cada entrada en dos bytes (bajo, alto)
+    """
+    table = bytearray(512)
+
+    for i in range(256):
+        crc = i
+
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 0x0001 else crc >> 1
+
+        table[i * 2] = crc & 0xFF
+        table[i * 2 + 1] = crc >> 8
+
+    return bytes(table)
+
+
+_CRC_TABLE = _build_crc_table()
+
+
+@micropython.viper
+def modbus_crc(buf: ptr8, n: int) -> int:
+    """
+    Calculo el CRC-16 de Modbus RTU de los n primeros bytes de buf usando la
+    tabla precalculada, sin reservar memoria.
+
+    Args:
+        buf (bytes): Datos para los que calcular el CRC (bytes, bytearray o memoryview)
+        n (int): Número de bytes a incluir
+
+    Returns:
+        int: CRC de 16 bits, se envía con el byte bajo primero
+    """
+    table = ptr8(_CRC_TABLE)
+    crc = 0xFFFF
+
+    for i in range(n):
+        idx = ((crc ^ buf[i]) & 0xFF) << 1
+        crc = (crc >> 8) ^ (table[idx] | (table[idx + 1] << 8))
+
+    return crc
 
 #######################################
 # #            FUNCIONES            # #
 #######################################
 
+def build_frame(register, bits, frame=None):
+    """
+    Construyo la trama Modbus RTU para leer registros (código de función 3).
+
+    Formato: [slave_id, function_code, reg_addr_hi, reg_addr_lo, reg_count_hi, reg_count_lo, crc_lo, crc_hi]
+
+    Args:
+        register (int): Dirección del primer registro
+        bits (int): Número de registros a leer
+        frame (bytearray, opcional): Búfer de 8 bytes a rellenar, si no lo creo
+
+    Returns:
+        bytearray: Trama completa con su CRC
+    """
+    if frame is None:
+        frame = bytearray(8)
+
+    frame[0] = SLAVE_ID
+    frame[1] = READ_FUNCTION_CODE
+    frame[2] = (register >> 8) & 0xFF
+    frame[3] = register & 0xFF
+    frame[4] = (bits >> 8) & 0xFF
+    frame[5] = bits & 0xFF
+
+    # Calculo y añado CRC (byte bajo primero)
+    crc = modbus_crc(frame, 6)
+    frame[6] = crc & 0xFF
+    frame[7] = crc >> 8
+
+    return frame
+
+
 class SerialConnection:
     """
     Mi clase para comunicación serial con dispositivos Modbus RTU usando UART de MicroPython.
@@ -78,7 +171,8 @@ class SerialConnection:
     """
     
     def __init__(self, debug=True, tx_pin=0, rx_pin=1, baudrate=DEFAULT_BAUDRATE,
-                 timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES):
+                 timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 timeout_char=DEFAULT_TIMEOUT_CHAR):
         """
         Inicializo la conexión serial.
         
@@ -89,19 +183,28 @@ class SerialConnection:
             baudrate (int): Velocidad de transmisión para la comunicación serial
             timeout (float): Tiempo de espera en segundos
             retries (int): Número de reintentos para comunicaciones fallidas
+            timeout_char (int): Espera máxima entre bytes de una trama en milisegundos
         """
         self.DEBUG = debug
         self.tx_pin = tx_pin
         self.rx_pin = rx_pin
         self.baudrate = baudrate
         self.timeout = timeout
+        self.timeout_char = timeout_char
         self.retries = retries
         self.uart = None
+
+        # Trama de petición reutilizable (8 bytes), se envía en una sola escritura
+        self._tx = bytearray(8)
+
+        # Búfer de recepción propio para quien no pasa el suyo, así ninguna
+        # lectura reserva la respuesta completa
+        self._rx = bytearray(MAX_RESPONSE_SIZE)
         
         # Inicializo UART
         self.connect()
         
-        if self.DEBUG:
+        if _DEBUG and self.DEBUG:
             print(f"Conexión Serial inicializada: TX={tx_pin}, RX={rx_pin}, Baudrate={baudrate}")
 
     def connect(self):
@@ -124,14 +227,39 @@ class SerialConnection:
                             bits=8,
                             parity=None,
                             stop=1,
-                            timeout=timeout_ms)  # Paso el timeout durante la inicialización
+                            timeout=timeout_ms,  # Paso el timeout durante la inicialización
+                            timeout_char=self.timeout_char)
             
             return True
         except Exception as e:
-            if self.DEBUG:
+            if _DEBUG and self.DEBUG:
                 print(f"Error al conectar con UART: {e}")
             return False
 
+    def set_baudrate(self, baudrate, timeout=None):
+        """
+        Cambio la velocidad de transmisión y vuelvo a abrir el UART con ella.
+        Las tramas ya construidas no dependen de la velocidad, siguen valiendo.
+
+        Args:
+            baudrate (int): Nueva velocidad de transmisión
+            timeout (float, opcional): Nuevo tiempo de espera en segundos
+
+        Returns:
+            bool: True si el UART se abrió con la nueva velocidad
+        """
+        self.baudrate = baudrate
+
+        if timeout is not None:
+            self.timeout = timeout
+
+        self.close()
+
+        if _DEBUG and self.DEBUG:
+            print(f"Cambio la velocidad del UART a {baudrate} baudios")
+
+        return self.connect()
+
     def close(self):
         """
         Cierro la conexión con el dispositivo.
@@ -148,97 +276,135 @@ class SerialConnection:
                 self.uart = None
             return True
         except Exception as e:
-            if self.DEBUG:
+            if _DEBUG and self.DEBUG:
                 print(f"Error al cerrar UART: {e}")
             return False
 
-    def _calculate_crc(self, data):
+    def _ensure_open(self):
         """
-        Calculo el CRC-16 de Modbus RTU para los datos proporcionados.
-        
+        Abro el UART si aún no lo está.
+
+        Returns:
+            UART: Conexión abierta o None si no se pudo abrir
+        """
+        if not self.uart:
+            self.connect()
+
+        return self.uart
+
+    def _receive(self, rx, expected):
+        """
+        Recibo una respuesta en rx hasta completar la longitud esperada, hasta
+        recibir una respuesta de error completa o hasta agotar el plazo.
+
         Args:
-            data (bytes): Datos para los que calcular el CRC
-            
+            rx (memoryview): Búfer de recepción de al menos expected bytes
+            expected (int): Longitud de la respuesta correcta
+
         Returns:
-            bytes: CRC como bytes (2 bytes, little endian)
+            memoryview: Bytes recibidos o None si no llegó nada
         """
-        crc = 0xFFFF
-        
-        for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                if crc & 0x0001:
-                    crc >>= 1
-                    crc ^= 0xA001
-                else:
-                    crc >>= 1
-        
-        # Devuelvo CRC en formato little-endian (byte bajo primero)
-        return bytes([crc & 0xFF, crc >> 8])
+        # Plazo: lo que tarda en transmitirse la respuesta (10 bits por byte) y un margen
+        deadline = time.ticks_add(time.ticks_ms(),
+                                  RESPONSE_MARGIN_MS + expected * 10000 // self.baudrate)
+        received = 0
+
+        while received < expected:
+            count = self.uart.readinto(rx[received:expected])
+
+            if count:
+                received += count
+
+                # Una respuesta de error (código de función + 0x80) ocupa 5 bytes
+                if received >= 5 and rx[1] & 0x80:
+                    received = 5
+                    break
 
-    def read_register(self, register, bits=2, type_data=None):
+            if time.ticks_diff(deadline, time.ticks_ms()) <= 0:
+                break
+
+        return rx[:received] if received else None
+
+    def read_register(self, register, bits=2, buf=None):
         """
-        Leo un registro y devuelvo su valor.
+        Leo uno o varios registros y devuelvo sus datos en crudo.
         
         Args:
             register (int): Dirección del registro a leer
             bits (int): Número de registros a leer
-            type_data (str, opcional): Tipo de datos a devolver
+            buf (bytearray, opcional): Búfer donde recibir la respuesta, así
+                                       no reservo memoria en cada lectura
             
         Returns:
-            list: Valores del registro o None si hay error
+            bytes: Datos de los registros, 2 bytes por registro en big endian
+                   (memoryview sobre buf si se pasa buf) o None si hay error
+        """
+        # Creo la trama Modbus RTU una vez para todos los intentos
+        return self.send_prebuilt(build_frame(register, bits, self._tx), bits, buf)
+
+    def send_prebuilt(self, frame, bits, buf=None):
+        """
+        Envío una trama de lectura ya construida (con su CRC) y devuelvo los
+        datos en crudo de la respuesta. Así quien lee siempre los mismos
+        registros no vuelve a construir la trama ni a calcular su CRC.
+
+        Args:
+            frame (bytes): Trama de 8 bytes creada con build_frame()
+            bits (int): Número de registros que pide la trama
+            buf (bytearray, opcional): Búfer donde recibir la respuesta
+
+        Returns:
+            bytes: Datos de los registros (memoryview sobre buf si se pasa buf)
+                   o None si hay error
         """
+        # Longitud de la respuesta esperada: cabecera (3), datos y CRC (2)
+        expected = 5 + bits * 2
+
+        # Sin búfer del llamador recibo en el mío y devuelvo una copia de los
+        # datos, el búfer se reutiliza en la siguiente lectura
+        copy = buf is None or len(buf) < expected
+        rx = memoryview(self._rx if copy else buf)[:expected]
+        slave_id = frame[0]
+        function_code = frame[1]
+
+        # Compruebo la conexión una vez, no en cada intento
+        uart = self._ensure_open()
+
+        if uart is None:
+            return None
+
         for attempt in range(self.retries):
             try:
-                # Me aseguro de que la conexión esté abierta
-                if not self.uart:
-                    self.connect()
-                
-                # Creo mensaje Modbus RTU para leer registros
-                # Formato: [slave_id, function_code, reg_addr_hi, reg_addr_lo, reg_count_hi, reg_count_lo, crc_lo, crc_hi]
-                slave_id = 1  # ID de esclavo predeterminado para Renogy Rover Li
-                function_code = 3  # Código para leer registros
-                
-                # Convierto dirección de registro y cantidad a bytes
-                reg_addr_hi = (register >> 8) & 0xFF
-                reg_addr_lo = register & 0xFF
-                reg_count_hi = (bits >> 8) & 0xFF
-                reg_count_lo = bits & 0xFF
-                
-                # Creo mensaje sin CRC
-                message = bytes([slave_id, function_code, reg_addr_hi, reg_addr_lo, reg_count_hi, reg_count_lo])
-                
-                # Calculo y añado CRC
-                crc = self._calculate_crc(message)
-                message += crc
-                
-                # Limpio buffer de recepción
-                self.uart.read()
-                
-                # Envío mensaje
-                self.uart.write(message)
+                # Limpio buffer de recepción, solo si hay algo pendiente (read()
+                # sin longitud espera siempre al timeout)
+                pending = uart.any()
+
+                if pending:
+                    uart.read(pending)
                 
-                # Espero respuesta (mínimo 5 bytes: slave_id, function_code, byte_count, al menos 2 bytes de CRC)
-                time.sleep(0.1)  # Pequeña pausa para asegurar que la respuesta esté lista
+                # Envío la trama completa de una vez, un hueco entre bytes
+                # haría que el controlador la diera por terminada
+                uart.write(frame)
                 
-                # Leo respuesta
-                response = self.uart.read()
+                # Leo exactamente la longitud esperada, vuelvo en cuanto llega
+                # la trama completa en lugar de esperar al timeout
+                response = self._receive(rx, expected)
                 
                 if not response or len(response) < 5:
-                    if self.DEBUG:
+                    if _DEBUG and self.DEBUG:
                         print(f"Sin respuesta o respuesta demasiado corta: {response}")
                     continue  # Reintento
                 
                 # Verifico si es una respuesta de error (código de función + 0x80)
                 if response[1] == function_code + 0x80:
-                    if self.DEBUG:
+                    if _DEBUG and self.DEBUG:
                         print(f"Respuesta de error: Código de excepción {response[2]}")
                     return None
                 
                 # Verifico el formato de la respuesta
                 if response[0] != slave_id or response[1] != function_code:
-                    if self.DEBUG:
-                        print(f"Cabecera de respuesta inválida: {response[:2]}")
+                    if _DEBUG and self.DEBUG:
+                        print(f"Cabecera de respuesta inválida: {bytes(response[:2])}")
                     continue  # Reintento
                 
                 # Obtengo el conteo de bytes
@@ -246,62 +412,94 @@ class SerialConnection:
                 
                 # Verifico si la respuesta tiene suficientes datos
                 if len(response) < byte_count + 5:  # slave_id + function_code + byte_count + data + 2 bytes CRC
-                    if self.DEBUG:
+                    if _DEBUG and self.DEBUG:
                         print(f"Respuesta demasiado corta: esperaba {byte_count + 5}, recibí {len(response)}")
                     continue  # Reintento
                 
                 # Extraigo los datos
                 data = response[3:3+byte_count]
                 
-                # Verifico el CRC
-                received_crc = response[3+byte_count:3+byte_count+2]
-                calculated_crc = self._calculate_crc(response[:3+byte_count])
+                # Verifico el CRC, byte a byte porque response puede ser un memoryview
+                calculated_crc = modbus_crc(response, 3 + byte_count)
                 
-                if received_crc != calculated_crc:
-                    if self.DEBUG:
-                        print(f"CRC no coincide: recibido {received_crc}, calculado {calculated_crc}")
+                if response[3+byte_count] != calculated_crc & 0xFF or response[4+byte_count] != calculated_crc >> 8:
+                    if _DEBUG and self.DEBUG:
+                        print(f"CRC no coincide: recibido {bytes(response[3+byte_count:5+byte_count])}, calculado {hex(calculated_crc)}")
                     continue  # Reintento
                 
-                # Analizo los valores de los registros (cada registro es de 2 bytes)
-                registers = []
-                for i in range(0, byte_count, 2):
-                    if i + 1 < byte_count:
-                        reg_value = (data[i] << 8) + data[i+1]
-                        registers.append(reg_value)
-                
-                if self.DEBUG:
-                    print(f"Registro: {register}, Valor: {registers}")
-                
-                return registers
+                if _DEBUG and self.DEBUG:
+                    print(f"Registro: {(frame[2] << 8) | frame[3]}, {byte_count} bytes")
+
+                return bytes(data) if copy else data
                 
+            except OSError as e:
+                # Solo un fallo del UART merece esperar, con pausas crecientes
+                if _DEBUG and self.DEBUG:
+                    print(f"Error del UART al leer registro: {e}")
+                if attempt < self.retries - 1:
+                    time.sleep_ms(RETRY_BACKOFF_MS << attempt)
             except Exception as e:
-                if self.DEBUG:
+                # CRC o tramas incorrectas no ocupan el bus, reintento ya
+                if _DEBUG and self.DEBUG:
                     print(f"Error al leer registro: {e}")
-                time.sleep(0.1)  # Pequeña pausa antes de reintentar
         
         # Todos los reintentos fallaron
-        if self.DEBUG:
-            print(f"No se pudo leer el registro {register} después de {self.retries} intentos")
+        if _DEBUG and self.DEBUG:
+            print(f"No se pudo leer el registro {(frame[2] << 8) | frame[3]} después de {self.retries} intentos")
         
         return None
 
-    def read_registers(self, registers, bits=2):
+    def read_block(self, start, count, buf=None):
         """
-        Leo múltiples registros y devuelvo sus valores.
-        
+        Leo un bloque de registros consecutivos en una sola petición.
+
         Args:
-            registers (list): Lista de direcciones de registros a leer
-            bits (int): Número de registros a leer para cada dirección
-            
+            start (int): Primer registro a leer
+            count (int): Número de registros (como mucho MAX_READ_COUNT)
+            buf (bytearray, opcional): Búfer donde recibir la respuesta
+
         Returns:
-            dict: Diccionario de valores de registro con direcciones de registro como claves
+            bytes: Datos del bloque, 2 bytes por registro, o None si hay error
+        """
+        return self.read_register(start, count, buf)
+
+    def read_ranges(self, ranges, gap=0):
         """
-        # Inicializo diccionario para almacenar resultados
+        Leo varios rangos de registros con el menor número de peticiones,
+        uniendo los que se solapan o están a menos de gap registros.
+
+        Args:
+            ranges (list): Rangos (inicio, cantidad) a leer
+            gap (int): Registros sin usar que acepto leer para unir dos rangos
+
+        Returns:
+            dict: Datos en crudo de cada rango (o None si falló su lectura),
+                  con el registro de inicio como clave
+        """
+        # Ordeno por dirección y uno los rangos cercanos en bloques
+        blocks = []
+
+        for start, count in sorted(ranges):
+            end = start + count
+
+            if blocks:
+                block_start, block_end = blocks[-1]
+
+                if start <= block_end + gap and max(end, block_end) - block_start <= MAX_READ_COUNT:
+                    blocks[-1] = (block_start, max(end, block_end))
+                    continue
+
+            blocks.append((start, end))
+
+        # Una petición por bloque y reparto sus datos entre los rangos pedidos
         results = {}
-        
-        # Leo cada registro individualmente
-        for register in registers:
-            results[register] = self.read_register(register, bits)
-        
-        # Devuelvo todos los resultados
-        return results
\ No newline at end of file
+
+        for block_start, block_end in blocks:
+            data = self.read_block(block_start, block_end - block_start)
+
+            for start, count in ranges:
+                if block_start <= start and start + count <= block_end:
+                    offset = (start - block_start) * 2
+                    results[start] = data[offset:offset + count * 2] if data else None
+
+        return results
@@ -15,7 +15,7 @@
 #              usando una Raspberry Pi Pico con MicroPython. Leo datos del
 #              controlador y los subo a una API y opcionalmente a Home Assistant.
 #
-# Dependencies: MicroPython, urequests, ujson, ntptime
+# Dependencies: MicroPython, ujson, ntptime
 #
 # Revision 0.02 - Adaptado para Raspberry Pi Pico con MicroPython
 #
@@ -50,59 +50,62 @@ import time
 import machine
 import ntptime
 import gc
+import sys
 
 # Intento importar variables de entorno desde env.py
 try:
     import env
 except ImportError:
     print("Advertencia: env.py no encontrado. Usando valores predeterminados.")
-    # Valores predeterminados si env.py no se encuentra
-    env = type('obj', (object,), {
-        'DEBUG': False,
-        'WIFI_SSID': None,
-        'WIFI_PASSWORD': None,
-        'WIFI_COUNTRY': 'ES',
-        'WIFI_ALTERNATIVES': None,
-        'DEVICE_ID': 1,
-        'API_URL': None,
-        'API_PATH': None,
-        'API_TOKEN': None,
-        'UPLOAD_API': False,
-        'HOME_ASSISTANT_URL': None,
-        'HOME_ASSISTANT_TOKEN': None,
-        'UPLOAD_HOME_ASSISTANT': False,
-        'SERIAL_TX_PIN': 0,
-        'SERIAL_RX_PIN': 1,
-        'SLEEP_TIME': 60,  # Sleep time in seconds
-    })
+    # Sin env.py, getattr() devuelve el valor predeterminado de cada variable
+    env = None
 
 #######################################
 # #             Variables           # #
 #######################################
 
+# Leo cada variable de env.py una sola vez al arrancar, con getattr() y su
+# valor predeterminado si no está definida
+
 # Modo de depuración
-DEBUG = env.DEBUG if hasattr(env, 'DEBUG') else False
+DEBUG = getattr(env, 'DEBUG', False)
 
 # Tiempo de espera entre lecturas (en segundos)
-SLEEP_TIME = env.SLEEP_TIME if hasattr(env, 'SLEEP_TIME') else 60
+SLEEP_TIME = getattr(env, 'SLEEP_TIME', 60)
+
+# Configuración WiFi
+WIFI_SSID = getattr(env, 'WIFI_SSID', None)
+WIFI_PASSWORD = getattr(env, 'WIFI_PASSWORD', None)
+WIFI_COUNTRY = getattr(env, 'WIFI_COUNTRY', 'ES')
+WIFI_ALTERNATIVES = getattr(env, 'WIFI_ALTERNATIVES', None)
+
+# Pines de los LEDs externos (opcionales)
+LED_POWER_PIN = getattr(env, 'LED_POWER_PIN', None)
+LED_UPLOAD_PIN = getattr(env, 'LED_UPLOAD_PIN', None)
+LED_CYCLE_PIN = getattr(env, 'LED_CYCLE_PIN', None)
 
 # Pines para conexión serial
-SERIAL_TX_PIN = env.SERIAL_TX_PIN if hasattr(env, 'SERIAL_TX_PIN') else 0
-SERIAL_RX_PIN = env.SERIAL_RX_PIN if hasattr(env, 'SERIAL_RX_PIN') else 1
+SERIAL_TX_PIN = getattr(env, 'SERIAL_TX_PIN', 0)
+SERIAL_RX_PIN = getattr(env, 'SERIAL_RX_PIN', 1)
+SERIAL_BAUDRATE = getattr(env, 'SERIAL_BAUDRATE', 9600)
 
 # Configuración para subida a la API
-UPLOAD_API = env.UPLOAD_API if hasattr(env, 'UPLOAD_API') else False
-API_URL = env.API_URL if hasattr(env, 'API_URL') else None
-API_PATH = env.API_PATH if hasattr(env, 'API_PATH') else None
-API_TOKEN = env.API_TOKEN if hasattr(env, 'API_TOKEN') else None
+UPLOAD_API = getattr(env, 'UPLOAD_API', False)
+API_URL = getattr(env, 'API_URL', None)
+API_PATH = getattr(env, 'API_PATH', None)
+API_TOKEN = getattr(env, 'API_TOKEN', None)
 
 # Configuración para subida a Home Assistant
-UPLOAD_HOME_ASSISTANT = env.UPLOAD_HOME_ASSISTANT if hasattr(env, 'UPLOAD_HOME_ASSISTANT') else False
-HOME_ASSISTANT_URL = env.HOME_ASSISTANT_URL if hasattr(env, 'HOME_ASSISTANT_URL') else None
-HOME_ASSISTANT_TOKEN = env.HOME_ASSISTANT_TOKEN if hasattr(env, 'HOME_ASSISTANT_TOKEN') else None
+UPLOAD_HOME_ASSISTANT = getattr(env, 'UPLOAD_HOME_ASSISTANT', False)
+HOME_ASSISTANT_URL = getattr(env, 'HOME_ASSISTANT_URL', None)
+HOME_ASSISTANT_TOKEN = getattr(env, 'HOME_ASSISTANT_TOKEN', None)
+HOME_ASSISTANT_BULK_PATH = getattr(env, 'HOME_ASSISTANT_BULK_PATH', None)
 
 # ID del dispositivo
-DEVICE_ID = env.DEVICE_ID if hasattr(env, 'DEVICE_ID') else 1
+DEVICE_ID = getattr(env, 'DEVICE_ID', 1)
+
+# Sin subidas configuradas no hay nada que conservar en RAM entre ciclos
+NEED_WIFI = UPLOAD_API or UPLOAD_HOME_ASSISTANT
 
 #######################################
 # #            FUNCIONES            # #
@@ -128,18 +131,26 @@ def sync_time():
             print(f"Error al sincronizar la hora: {e}")
         return False
 
-def sleep_pause(seconds):
+def sleep_pause(seconds, rpi_pico=None):
     """
     Pauso la ejecución durante el número de segundos especificado.
     Uso una pausa simple en lugar de light_sleep debido a problemas de compatibilidad.
     Por algún motivo, la pausa simple no funciona correctamente en
     MicroPython con raspberry pi pico.
+
+    Si no hay subidas configuradas (ni depuración por consola) no hay estado
+    que conservar, así que entro en sueño profundo y la placa se reinicia al
+    despertar, consumiendo mucho menos durante la espera.
     
     Args:
         seconds (int): Número de segundos para pausar
+        rpi_pico (RpiPico, opcional): Placa con la que entrar en sueño profundo
     """
     if DEBUG:
         print(f"Pausando durante {seconds} segundos...")
+
+    if rpi_pico and not NEED_WIFI and not DEBUG:
+        rpi_pico.deepsleep(seconds)
     
     # Uso una pausa simple en lugar de light_sleep
     time.sleep(seconds)
@@ -148,15 +159,18 @@ def collect_garbage():
     """
     Ejecuto la recolección de basura para liberar memoria.
     """
-    if DEBUG:
-        print("Ejecutando recolección de basura...")
-        
+    # gc.mem_free() recorre todo el heap, solo lo consulto al depurar
+    if not DEBUG:
+        gc.collect()
+        return
+
+    print("Ejecutando recolección de basura...")
+
     mem_before = gc.mem_free()
     gc.collect()
     mem_after = gc.mem_free()
-    
-    if DEBUG:
-        print(f"Memoria liberada: {mem_after - mem_before} bytes")
+
+    print(f"Memoria liberada: {mem_after - mem_before} bytes")
 
 def loop():
     """
@@ -164,14 +178,14 @@ def loop():
     """
     # Inicializo Raspberry Pi Pico
     rpi_pico = RpiPico(
-        ssid=env.WIFI_SSID if hasattr(env, 'WIFI_SSID') else None,
-        password=env.WIFI_PASSWORD if hasattr(env, 'WIFI_PASSWORD') else None,
+        ssid=WIFI_SSID,
+        password=WIFI_PASSWORD,
         debug=DEBUG,
-        country=env.WIFI_COUNTRY if hasattr(env, 'WIFI_COUNTRY') else 'ES',
-        alternatives_ap=env.WIFI_ALTERNATIVES if hasattr(env, 'WIFI_ALTERNATIVES') else None,
-        led_power_pin=env.LED_POWER_PIN if hasattr(env, 'LED_POWER_PIN') else None,
-        led_upload_pin=env.LED_UPLOAD_PIN if hasattr(env, 'LED_UPLOAD_PIN') else None,
-        led_cycle_pin=env.LED_CYCLE_PIN if hasattr(env, 'LED_CYCLE_PIN') else None
+        country=WIFI_COUNTRY,
+        alternatives_ap=WIFI_ALTERNATIVES,
+        led_power_pin=LED_POWER_PIN,
+        led_upload_pin=LED_UPLOAD_PIN,
+        led_cycle_pin=LED_CYCLE_PIN
     )
     
     # Enciendo el LED integrado para indicar que el programa está ejecutándose
@@ -204,6 +218,7 @@ def loop():
             url=HOME_ASSISTANT_URL,
             token=HOME_ASSISTANT_TOKEN,
             device_id=DEVICE_ID,
+            bulk_path=HOME_ASSISTANT_BULK_PATH,
             debug=DEBUG
         )
     
@@ -212,9 +227,18 @@ def loop():
         device_id=DEVICE_ID,
         tx_pin=SERIAL_TX_PIN,
         rx_pin=SERIAL_RX_PIN,
+        baudrate=SERIAL_BAUDRATE,
         debug=DEBUG
     )
     
+    # Datos de cada ciclo, reutilizo el mismo diccionario en lugar de crear uno nuevo
+    params = {}
+
+    # Fijo el umbral del recolector para que actúe de forma predecible antes
+    # de reservar los búferes de red, y no a mitad de una petición
+    gc.collect()
+    gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+
     while True:
         try:
             if DEBUG:
@@ -223,28 +247,32 @@ def loop():
             # Enciendo el LED de ciclo para indicar que estoy leyendo datos
             rpi_pico.led_cycle_on()
             
-            # Leo datos del controlador solar
-            datas = solar_controller.get_all_datas()
-            info = solar_controller.get_all_controller_info_datas()
-            historical_today = solar_controller.get_today_historical_info_datas()
-            historical = solar_controller.get_historical_info_datas()
-            
-            # Combino todos los datos
-            # Uso dict.update() en lugar de ** unpacking para compatibilidad con MicroPython
-            params = {}
-            params.update(datas)
-            params.update(info)
-            params.update(historical_today)
-            params.update(historical)
+            # Completo los datos estáticos que falten en caché, solo leo los pendientes
+            solar_controller.prime_cache()
+
+            # Actualizo los registros en vivo (los lentos por turnos), los getters los reutilizan
+            solar_controller.poll()
+
+            # Leo datos del controlador solar, get_all_datas() ya incluye la
+            # información del controlador y los históricos
+            params.clear()
+            solar_controller.get_all_datas(params)
             
             # Apago el LED de ciclo una vez terminada la lectura
             rpi_pico.led_cycle_off()
             
             if DEBUG:
                 print('Datos recolectados del controlador solar')
+
+            # Compruebo el WiFi una vez por ciclo, sin conexión no intento
+            # las subidas para no esperar al timeout de cada petición
+            wifi_ok = NEED_WIFI and rpi_pico.wifi_is_connected()
+
+            if DEBUG and NEED_WIFI and not wifi_ok:
+                print("WiFi no conectado, omito las subidas en este ciclo")
             
             # Subo a la API si está habilitada
-            if api and UPLOAD_API:
+            if api and UPLOAD_API and wifi_ok:
                 if DEBUG:
                     print("Subiendo datos a la API...")
                 
@@ -252,6 +280,9 @@ def loop():
                 rpi_pico.led_upload_on()
                 
                 success = api.send_to_api(params)
+
+                # Cierro la conexión hasta el próximo ciclo
+                api.close()
                 
                 # Apago el LED de subida después de la comunicación con la API
                 rpi_pico.led_upload_off()
@@ -263,7 +294,7 @@ def loop():
                         print("Error al subir datos a la API")
             
             # Subo a Home Assistant si está habilitado
-            if home_assistant and UPLOAD_HOME_ASSISTANT:
+            if home_assistant and UPLOAD_HOME_ASSISTANT and wifi_ok:
                 if DEBUG:
                     print("Subiendo datos a Home Assistant...")
                 
@@ -293,12 +324,10 @@ def loop():
                     
                     # Solo actualizo los sensores si el dispositivo existe
                     if device_exists:
-                        # Actualizo datos del controlador solar
+                        # Actualizo datos del controlador solar junto a los
+                        # sensores del microcontrolador en un solo lote
                         success = home_assistant.update_solar_controller_data(params)
                         
-                        # Actualizo sensores del microcontrolador
-                        home_assistant.update_microcontroller_sensors()
-                        
                         if DEBUG:
                             if success:
                                 print("Datos subidos a Home Assistant correctamente")
@@ -311,21 +340,21 @@ def loop():
                     if DEBUG:
                         print("Home Assistant no es accesible")
                 
+                # Cierro la conexión persistente hasta el próximo ciclo
+                home_assistant.close()
+                
                 # Apago el LED de subida después de la comunicación con Home Assistant
                 rpi_pico.led_upload_off()
             
             if DEBUG:
-                print(f"Ciclo completado correctamente")
+                print("Ciclo completado correctamente")
             
             # Ejecuto la recolección de basura
             collect_garbage()
             
-            # Parpadeo el LED integrado para indicar un ciclo exitoso
-            rpi_pico.led_off()
-            time.sleep(0.2)
-            rpi_pico.led_on()
-            time.sleep(0.2)
-            rpi_pico.led_off()
+            # Parpadeo el LED integrado para indicar un ciclo exitoso, sin
+            # esperar a que termine el parpadeo
+            rpi_pico.led_blink(1, 200)
             
             # Aseguro que los LEDs de ciclo y subida estén apagados antes de dormir
             rpi_pico.led_cycle_off()
@@ -336,7 +365,7 @@ def loop():
                 print(f"Pausando durante {SLEEP_TIME} segundos antes del próximo ciclo")
             
             # Uso pausa simple en lugar de light_sleep
-            sleep_pause(SLEEP_TIME)
+            sleep_pause(SLEEP_TIME, rpi_pico)
             
             # Enciendo el LED integrado nuevamente al despertar
             rpi_pico.led_on()
@@ -348,7 +377,6 @@ def loop():
             if DEBUG:
                 print(f"Error en el bucle principal: {e}")
                 print(f"Tipo de excepción: {type(e).__name__}")
-                import sys
                 # Imprimo el traceback de la excepción si está disponible
                 if hasattr(sys, 'print_exception'):
                     sys.print_exception(e)
@@ -358,17 +386,13 @@ def loop():
             rpi_pico.led_upload_off()
             
             # Parpadeo el LED integrado rápidamente para indicar error
-            for _ in range(5):
-                rpi_pico.led_on()
-                time.sleep(0.1)
-                rpi_pico.led_off()
-                time.sleep(0.1)
+            rpi_pico.led_blink(5, 100)
             
             if DEBUG:
                 print(f"Ocurrió un error, pausando durante {SLEEP_TIME} segundos antes del próximo ciclo")
             
             # Uso pausa simple en lugar de light_sleep, incluso después de errores
-            sleep_pause(SLEEP_TIME)
+            sleep_pause(SLEEP_TIME, rpi_pico)
             
             # Aseguro que el LED de encendido siga encendido después del error
             rpi_pico.led_power_on()
@@ -80,41 +80,46 @@ def test_device_creation():
         debug=DEBUG
     )
     
-    # Verifico si Home Assistant es accesible
-    if not home_assistant.check_connection():
-        print("Error: No se puede conectar a Home Assistant. Verifica la URL y el token.")
-        return False
+    # Las comprobaciones comparten la conexión persistente de la sesión
+    # (keep-alive), así solo hay una conexión TCP/TLS para toda la prueba
+    try:
+        # Verifico si Home Assistant es accesible
+        if not home_assistant.check_connection():
+            print("Error: No se puede conectar a Home Assistant. Verifica la URL y el token.")
+            return False
     
-    print("Home Assistant es accesible.")
+        print("Home Assistant es accesible.")
     
-    # Intento crear el dispositivo
-    print("\nCreando dispositivo...")
-    device_created = home_assistant.create_device_entity()
+        # Intento crear el dispositivo
+        print("\nCreando dispositivo...")
+        device_created = home_assistant.create_device_entity()
     
-    if device_created:
-        print("✓ Dispositivo creado correctamente.")
-    else:
-        print("✗ Error al crear el dispositivo.")
-        return False
+        if device_created:
+            print("✓ Dispositivo creado correctamente.")
+        else:
+            print("✗ Error al crear el dispositivo.")
+            return False
     
-    # Verifico si el dispositivo existe
-    print("\nVerificando si el dispositivo existe...")
-    device_exists = home_assistant.verify_device_exists()
+        # Verifico si el dispositivo existe
+        print("\nVerificando si el dispositivo existe...")
+        device_exists = home_assistant.verify_device_exists()
     
-    if device_exists:
-        print("✓ El dispositivo existe en Home Assistant.")
-    else:
-        print("✗ El dispositivo no existe en Home Assistant.")
-        return False
+        if device_exists:
+            print("✓ El dispositivo existe en Home Assistant.")
+        else:
+            print("✗ El dispositivo no existe en Home Assistant.")
+            return False
     
-    # Obtengo el ID de entidad del dispositivo
-    device_identifier = home_assistant.device_info["identifiers"][0]
-    entity_id = f"sensor.{device_identifier}_device"
+        # Obtengo el ID de entidad del dispositivo
+        device_identifier = home_assistant.device_info["identifiers"][0]
+        entity_id = f"sensor.{device_identifier}_device"
     
-    print(f"\nID de entidad del dispositivo: {entity_id}")
-    print(f"Información del dispositivo: {home_assistant.device_info}")
+        print(f"\nID de entidad del dispositivo: {entity_id}")
+        print(f"Información del dispositivo: {home_assistant.device_info}")
     
-    return True
+        return True
+    finally:
+        home_assistant.close()
 
 def main():
     """
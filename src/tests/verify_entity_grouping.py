@@ -13,7 +13,7 @@
 # Project Name: Raspberry Pi Pico Monitor Renogy Rover Li Solar Controller
 # Description: Script para verificar y corregir la agrupación de entidades en Home Assistant
 #
-# Dependencies: MicroPython, urequests, ujson
+# Dependencies: MicroPython, ujson
 #
 # Revision 0.01 - File Created
 # Additional Comments: Este script verifica que todas las entidades tengan la información
@@ -37,7 +37,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 
-import urequests
+from Models.HttpSession import HttpSession, BODY_IF_OK
 import ujson
 import time
 import sys
@@ -60,8 +60,21 @@ HA_TOKEN = env.HOME_ASSISTANT_TOKEN
 DEVICE_ID = env.DEVICE_ID if hasattr(env, 'DEVICE_ID') else 1
 DEBUG = True  # Siempre mostramos mensajes de depuración en este script
 
+# Identificador del dispositivo (formato nuevo y antiguo) e información del
+# dispositivo, no cambian durante la ejecución
+_DEVICE_IDENTIFIER = f"renogy_rover_li_{DEVICE_ID}"
+_EXPECTED_IDS = (_DEVICE_IDENTIFIER, f"solar_controller_{DEVICE_ID}")
+_UNIQUE_ID_PREFIXES = tuple(identifier + "_" for identifier in _EXPECTED_IDS)
+_DEVICE_INFO_TEMPLATE = {
+    "identifiers": [_DEVICE_IDENTIFIER],
+    "name": f"Controlador Solar Renogy Rover Li {DEVICE_ID}",
+    "manufacturer": "Renogy",
+    "model": "Rover Li",
+    "suggested_area": "Exterior"
+}
+
 # Lista completa de entidades que deberían estar agrupadas
-SOLAR_ENTITIES = [
+SOLAR_ENTITIES = (
     # Información del Controlador
     "sensor.solar_device_id",
     "sensor.solar_hardware",
@@ -121,29 +134,71 @@ SOLAR_ENTITIES = [
     "sensor.solar_controller_temperature",
     "sensor.solar_street_light_status",
     "sensor.solar_street_light_brightness",
-]
+)
 
-MICROCONTROLLER_ENTITIES = [
+MICROCONTROLLER_ENTITIES = (
     "sensor.microcontroller_temperature",
     "binary_sensor.microcontroller_wifi",
     "sensor.microcontroller_wifi_signal",
     "sensor.microcontroller_battery",
-]
+)
 
-# Todas las entidades
+# Todas las entidades, en tupla para recorrerlas y en conjunto para filtrar
+# la lista completa de estados
 ALL_ENTITIES = SOLAR_ENTITIES + MICROCONTROLLER_ENTITIES
+_ALL_ENTITIES_SET = frozenset(ALL_ENTITIES)
+
+# Cabeceras para las peticiones a la API de Home Assistant, el token no
+# cambia durante la ejecución (HttpSession añade "Connection: keep-alive")
+_HEADERS = {
+    "Authorization": "Bearer " + HA_TOKEN,
+    "Content-Type": "application/json"
+}
+
+# Resultado de check_entity_grouping() para una entidad que no existe y
+# atributos vacíos por defecto, se comparten y no se modifican
+_MISSING_RESULT = {
+    "exists": False,
+    "has_device": False,
+    "has_unique_id": False,
+    "correct_device_id": False,
+    "grouped": False,
+    "entity_data": None
+}
+_EMPTY = {}
+
+# Entidades no agrupadas de la última verificación (ID → datos) y cuándo se
+# hizo (ticks), la corrección las reutiliza si es reciente
+CHECK_CACHE_TTL_MS = 60000
+_last_ungrouped = None
+_last_check_ms = 0
 
-def get_headers():
+# Sesión HTTP persistente (keep-alive) para todas las peticiones, se crea en
+# main() y evita abrir una conexión TCP/TLS por cada entidad
+_session = None
+
+# Intentos por petición ante fallos transitorios (reinicio de Home Assistant,
+# límite de peticiones) y espera base en segundos del retroceso exponencial
+REQUEST_ATTEMPTS = 3
+REQUEST_BACKOFF = 0.5
+
+def ha_request(method, path, body=None, read_body=True):
     """
-    Obtiene las cabeceras para las peticiones a la API de Home Assistant.
+    Realizo una petición a Home Assistant con los reintentos de la sesión, así
+    un fallo puntual no hace que dé por ausente una entidad.
     
+    Args:
+        method (str): Método HTTP
+        path (str): Ruta de la API
+        body (str, opcional): Cuerpo de la petición
+        read_body: Igual que en HttpSession.request()
+        
     Returns:
-        dict: Cabeceras para las peticiones a la API
+        tuple: (código de estado o None si no hubo respuesta, cuerpo de la respuesta)
     """
-    return {
-        "Authorization": f"Bearer {HA_TOKEN}",
-        "Content-Type": "application/json"
-    }
+    _, data, status_code = _session.request_with_retry(method, path, body, read_body)
+    
+    return status_code, data
 
 def get_entity(entity_id):
     """
@@ -156,24 +211,56 @@ def get_entity(entity_id):
         dict: Información de la entidad o None si no existe
     """
     try:
-        url = f"{HA_URL}/api/states/{entity_id}"
-        headers = get_headers()
-        
-        response = urequests.get(url, headers=headers)
+        # Solo guardo el cuerpo si existe la entidad, el de los errores lo descarto
+        status_code, body = ha_request("GET", f"/api/states/{entity_id}",
+                                       read_body=BODY_IF_OK)
         
-        if response.status_code == 200:
-            return ujson.loads(response.text)
-        elif response.status_code == 404:
+        if status_code == 200:
+            entity = ujson.loads(body)
+            del body
+            return entity
+        elif status_code == 404:
             print(f"La entidad {entity_id} no existe en Home Assistant")
             return None
         else:
-            print(f"Error al obtener la entidad {entity_id}: {response.status_code}")
+            print(f"Error al obtener la entidad {entity_id}: {status_code}")
             return None
             
     except Exception as e:
         print(f"Excepción al obtener la entidad {entity_id}: {e}")
         return None
 
+def get_all_states():
+    """
+    Obtiene en una sola petición el estado de todas las entidades y se queda
+    con las de ALL_ENTITIES.
+    
+    Returns:
+        dict: Datos de cada entidad por su ID o None si falla, en ese caso
+              hay que consultarlas una a una
+    """
+    try:
+        status_code, body = _session.request("GET", "/api/states", read_body=BODY_IF_OK)
+        
+        if status_code != 200:
+            print(f"Error al obtener los estados: {status_code}")
+            return None
+        
+        data = ujson.loads(body)
+        del body
+        
+        return {entity["entity_id"]: entity for entity in data
+                if entity.get("entity_id") in _ALL_ENTITIES_SET}
+    
+    except MemoryError:
+        # Con muchas entidades la respuesta puede no caber en la memoria de la Pico
+        _session.close()
+        print("No hay memoria para obtener todos los estados, consulto las entidades una a una")
+        return None
+    except Exception as e:
+        print(f"Excepción al obtener los estados: {e}")
+        return None
+
 def update_entity(entity_id, state, attributes):
     """
     Actualiza una entidad en Home Assistant.
@@ -187,34 +274,34 @@ def update_entity(entity_id, state, attributes):
         bool: True si la actualización fue exitosa, False en caso contrario
     """
     try:
-        url = f"{HA_URL}/api/states/{entity_id}"
-        headers = get_headers()
-        
         payload = {
             "state": state,
             "attributes": attributes
         }
         
-        response = urequests.post(url, headers=headers, json=payload)
+        # Solo necesito el código de estado, descarto el cuerpo de la respuesta
+        status_code, _ = ha_request("POST", f"/api/states/{entity_id}",
+                                    ujson.dumps(payload), read_body=False)
         
-        if response.status_code in [200, 201]:
+        if status_code in [200, 201]:
             print(f"Entidad {entity_id} actualizada correctamente")
             return True
         else:
-            print(f"Error al actualizar la entidad {entity_id}: {response.status_code}")
-            print(f"Respuesta: {response.text}")
+            print(f"Error al actualizar la entidad {entity_id}: {status_code}")
             return False
             
     except Exception as e:
         print(f"Excepción al actualizar la entidad {entity_id}: {e}")
         return False
 
-def check_entity_grouping(entity_id):
+def check_entity_grouping(entity_id, states=None):
     """
     Verifica si una entidad está correctamente agrupada.
     
     Args:
         entity_id (str): ID de la entidad
+        states (dict, opcional): Estados ya obtenidos con get_all_states(),
+                                 si no se consulta la entidad
         
     Returns:
         dict: Resultado de la verificación con las claves:
@@ -222,41 +309,47 @@ def check_entity_grouping(entity_id):
             - has_device: True si la entidad tiene información de dispositivo, False en caso contrario
             - has_unique_id: True si la entidad tiene un ID único, False en caso contrario
             - correct_device_id: True si el ID del dispositivo es correcto, False en caso contrario
+            - grouped: True si la entidad queda agrupada en el dispositivo, False en caso contrario
             - entity_data: Datos de la entidad si existe, None en caso contrario
     """
-    entity_data = get_entity(entity_id)
+    if states is None:
+        entity_data = get_entity(entity_id)
+    else:
+        entity_data = states.get(entity_id)
     
     if not entity_data:
-        return {
-            "exists": False,
-            "has_device": False,
-            "has_unique_id": False,
-            "correct_device_id": False,
-            "entity_data": None
-        }
+        return _MISSING_RESULT
     
-    # Verifico si tiene información de dispositivo
-    has_device = "device" in entity_data.get("attributes", {})
+    # Leo los atributos una sola vez, sin crear un diccionario vacío por entidad
+    attributes = entity_data.get("attributes") or _EMPTY
+    device_info = attributes.get("device")
     
-    # Verifico si tiene ID único
-    has_unique_id = "unique_id" in entity_data.get("attributes", {})
+    # Verifico si tiene información de dispositivo y si tiene ID único
+    has_device = device_info is not None
+    has_unique_id = "unique_id" in attributes
     
-    # Verifico si el ID del dispositivo es correcto
+    # Verifico si el ID del dispositivo es correcto, acepto tanto el formato
+    # nuevo como el antiguo del identificador
     correct_device_id = False
     if has_device:
-        device_info = entity_data["attributes"]["device"]
-        if "identifiers" in device_info:
-            identifiers = device_info["identifiers"]
-            # Check for both old and new format device identifiers
-            expected_id_old = f"solar_controller_{DEVICE_ID}"
-            expected_id_new = f"renogy_rover_li_{DEVICE_ID}"
-            correct_device_id = expected_id_old in identifiers or expected_id_new in identifiers
+        identifiers = device_info.get("identifiers")
+        if identifiers:
+            correct_device_id = any(expected in identifiers for expected in _EXPECTED_IDS)
+
+    # Solo la entidad ancla lleva la información del dispositivo, el resto se
+    # agrupa mediante un unique_id con el identificador del dispositivo como prefijo
+    grouped = has_device and correct_device_id and has_unique_id
+
+    if not has_device and has_unique_id:
+        unique_id = attributes["unique_id"]
+        grouped = any(unique_id.startswith(prefix) for prefix in _UNIQUE_ID_PREFIXES)
     
     return {
         "exists": True,
         "has_device": has_device,
         "has_unique_id": has_unique_id,
         "correct_device_id": correct_device_id,
+        "grouped": grouped,
         "entity_data": entity_data
     }
 
@@ -279,23 +372,16 @@ def fix_entity_grouping(entity_id, entity_data):
     attributes = entity_data.get("attributes", {})
     
     # Creo la información del dispositivo usando el nuevo formato
-    device_info = {
-        "identifiers": [f"renogy_rover_li_{DEVICE_ID}"],
-        "name": f"Controlador Solar Renogy Rover Li {DEVICE_ID}",
-        "manufacturer": "Renogy",
-        "model": "Rover Li",
-        "sw_version": attributes.get("version", "unknown"),
-        "suggested_area": "Exterior"
-    }
+    device_info = dict(_DEVICE_INFO_TEMPLATE)
+    device_info["sw_version"] = attributes.get("version", "unknown")
     
     # Añado la información del dispositivo a los atributos
     attributes["device"] = device_info
     
     # Añado un ID único si no tiene, usando el nuevo formato
     if "unique_id" not in attributes:
-        device_identifier = f"renogy_rover_li_{DEVICE_ID}"
         entity_suffix = entity_id.split('.')[-1]
-        unique_id = f"{device_identifier}_{entity_suffix}"
+        unique_id = f"{_DEVICE_IDENTIFIER}_{entity_suffix}"
         attributes["unique_id"] = unique_id
     
     # Actualizo la entidad
@@ -314,41 +400,60 @@ def check_all_entities():
             - ungrouped: Número de entidades no agrupadas
             - fixable: Número de entidades que se pueden corregir
     """
+    global _last_ungrouped, _last_check_ms
+
     total = len(ALL_ENTITIES)
     existing = 0
     missing = 0
     grouped = 0
     ungrouped = 0
     fixable = 0
+    ungrouped_data = {}
     
     print("\n=== Verificando agrupación de entidades ===\n")
     
+    # Obtengo todas las entidades en una petición en lugar de una por entidad
+    states = get_all_states()
+    
+    # Acumulo el informe de cada entidad y lo escribo al terminar
+    lines = []
+    log = lines.append
+    
     for entity_id in ALL_ENTITIES:
-        print(f"Verificando {entity_id}...")
-        result = check_entity_grouping(entity_id)
+        log(f"Verificando {entity_id}...")
+        result = check_entity_grouping(entity_id, states)
         
         if result["exists"]:
             existing += 1
             
-            if result["has_device"] and result["correct_device_id"] and result["has_unique_id"]:
+            if result["grouped"]:
                 grouped += 1
-                print(f"  ✓ Correctamente agrupada")
+                log("  ✓ Correctamente agrupada")
             else:
                 ungrouped += 1
-                print(f"  ✗ No agrupada correctamente")
+                log("  ✗ No agrupada correctamente")
                 
                 if not result["has_device"]:
-                    print(f"    - No tiene información de dispositivo")
+                    log("    - No tiene información de dispositivo")
                 elif not result["correct_device_id"]:
-                    print(f"    - El ID del dispositivo es incorrecto")
+                    log("    - El ID del dispositivo es incorrecto")
                 
                 if not result["has_unique_id"]:
-                    print(f"    - No tiene ID único")
+                    log("    - No tiene ID único")
                 
                 fixable += 1
+                ungrouped_data[entity_id] = result["entity_data"]
         else:
             missing += 1
-            print(f"  ? No existe")
+            log("  ? No existe")
+    
+    # Escribo el informe de una vez, cada print es una escritura por el puerto serie
+    sys.stdout.write("\n".join(lines) + "\n")
+    del lines
+
+    # Guardo las no agrupadas para que la corrección no vuelva a consultarlas
+    _last_ungrouped = ungrouped_data
+    _last_check_ms = time.ticks_ms()
     
     return {
         "total": total,
@@ -369,24 +474,46 @@ def fix_all_entities():
             - fixed: Número de entidades corregidas
             - failed: Número de entidades que no se pudieron corregir
     """
+    global _last_ungrouped
+
     total = len(ALL_ENTITIES)
     fixed = 0
     failed = 0
     
     print("\n=== Corrigiendo agrupación de entidades ===\n")
     
-    for entity_id in ALL_ENTITIES:
-        print(f"Verificando {entity_id}...")
-        result = check_entity_grouping(entity_id)
+    # Si acabo de verificar las entidades, corrijo directamente las no
+    # agrupadas, si no las busco en memoria sobre todos los estados
+    if _last_ungrouped is not None and \
+            time.ticks_diff(time.ticks_ms(), _last_check_ms) < CHECK_CACHE_TTL_MS:
+        pending = _last_ungrouped
+    else:
+        # Obtengo todas las entidades en una petición en lugar de una por entidad
+        states = get_all_states()
+        pending = {}
         
-        if result["exists"] and not (result["has_device"] and result["correct_device_id"] and result["has_unique_id"]):
-            print(f"  Corrigiendo {entity_id}...")
-            if fix_entity_grouping(entity_id, result["entity_data"]):
-                fixed += 1
-                print(f"  ✓ Corregida")
-            else:
-                failed += 1
-                print(f"  ✗ No se pudo corregir")
+        for entity_id in ALL_ENTITIES:
+            result = check_entity_grouping(entity_id, states)
+            
+            if result["exists"] and not result["grouped"]:
+                pending[entity_id] = result["entity_data"]
+        
+        del states
+    
+    # Las correcciones cambian las entidades, la verificación guardada ya no vale
+    _last_ungrouped = None
+    
+    print(f"Entidades a corregir: {len(pending)}")
+    
+    # Solo envío una petición por cada entidad que hay que corregir
+    for entity_id, entity_data in pending.items():
+        print(f"  Corrigiendo {entity_id}...")
+        if fix_entity_grouping(entity_id, entity_data):
+            fixed += 1
+            print(f"  ✓ Corregida")
+        else:
+            failed += 1
+            print(f"  ✗ No se pudo corregir")
     
     return {
         "total": total,
@@ -398,26 +525,30 @@ def main():
     """
     Función principal del script.
     """
+    global _session
+
     print("\n=== Verificador de Agrupación de Entidades en Home Assistant ===\n")
     print(f"URL de Home Assistant: {HA_URL}")
     print(f"ID del Dispositivo: {DEVICE_ID}")
     
     # Verifico la conexión con Home Assistant
     print("\nVerificando conexión con Home Assistant...")
+    _session = HttpSession(HA_URL, _HEADERS, retries=REQUEST_ATTEMPTS,
+                           backoff_factor=REQUEST_BACKOFF, debug=DEBUG)
+
     try:
-        url = f"{HA_URL}/api/"
-        headers = get_headers()
-        
-        response = urequests.get(url, headers=headers)
+        status_code, _ = _session.request("GET", "/api/", read_body=False)
         
-        if response.status_code == 200:
+        if status_code == 200:
             print("✓ Conexión exitosa con Home Assistant")
         else:
-            print(f"✗ Error al conectar con Home Assistant: {response.status_code}")
+            print(f"✗ Error al conectar con Home Assistant: {status_code}")
+            _session.close()
             return
             
     except Exception as e:
         print(f"✗ Excepción al conectar con Home Assistant: {e}")
+        _session.close()
         return
     
     # Muestro el menú
@@ -450,6 +581,7 @@ def main():
             
         elif option == "3":
             print("\n¡Hasta luego!")
+            _session.close()
             break
             
         else: